@@ -0,0 +1,145 @@
+"""
+Search benchmark on a fixed set of midgame and endgame positions.
+
+Record a baseline and compare a later commit against it with:
+    python bench.py --depths 4 6 --time 1 --out before.json
+    python bench.py --depths 4 6 --time 1 --out after.json --compare before.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import time
+
+from bitboard import BitboardOthello
+from bot import ALGORITHMS, OthelloAI
+from othelo import Othello
+from perft import play_moves
+
+BACKENDS = {'list': Othello, 'bitboard': BitboardOthello}
+
+# (name, moves from the start, reference move). The midgame references come from a
+# depth 9 PVS search, the endgame references from the exact endgame solver.
+POSITIONS = [
+    ('mid-1', 'e3f3f4d3c6d6c4c5c3e6g2f5b6h1g5f6g4a7a6a5', (4, 1)),
+    ('mid-2', 'e3f5c6e2f4d3f3c5d6e6d2c4e1d1c1f1g1c2b5a5b6c3f7g3', (1, 5)),
+    ('mid-3', 'f4d3c6g4d2c2h4d1b1b3d6c5b6c4g3a2a4e2f2f1e6d7d8b2f3b4f5f6', (2, 2)),
+    ('mid-4', 'e3f5c6e2f2b7e1c3e6d3c4g1a8f6f4c5f7f3d6g8g2g4h5d2d1g6h7h4h3h6e8h8', (6, 4)),
+    ('end-1', 'e3f5c6e2f2b7d6c5e1g1b4b5d3b3g3c3g5e7a8h5f3c7c4f4a5g2h1f1c8b6a4e6a3h2h3d2d7h4h6a6a7e8f6d1c1g4',
+     (7, 5)),
+    ('end-2', 'e3f5c6e2f6c5c3c4e1d3b6b5a5d6c7d7e6e7e8f4d2b8c8d1f3f1a8b2a1f8g8d8c1g6g1h8f7g5h6b4c2f2g7b1b3h1g3',
+     (1, 6)),
+    ('end-3', 'e3f5g6g5f6d3c2d2c3e7e2d1c4h6h5f2f1h4h7h8g4f3c1b1e1g1d8e6f4g3c5d6g2h1f7h3h2d7c7g7g8c6b5f8e8b7a8c8',
+     (3, 1)),
+]
+
+
+def run_position(board_class, moves, reference, mode, limit, options):
+    """
+    Search one position with a fresh AI at a fixed depth or for a fixed time.
+
+    Returns:
+        dict: The move, reference agreement, nodes, time, nodes per second and the
+            time at which each depth was completed.
+    """
+    game, _ = play_moves(board_class, moves)
+    ai = OthelloAI(game, **options)
+    start = time.monotonic()
+    if mode == 'depth':
+        move = ai.search(max_depth=limit)
+    else:
+        move = ai.search(time_limit=limit)
+    elapsed = time.monotonic() - start
+    nodes = ai.nodes
+    return {
+        'empties': game.empty_count(),
+        'move': list(move),
+        'reference': list(reference),
+        'agree': move == reference,
+        'nodes': nodes,
+        'seconds': round(elapsed, 4),
+        'nps': round(nodes / elapsed) if elapsed else 0,
+        'completed_depth': ai.completed_depth,
+        'depth_times': {str(depth): round(t, 4) for depth, t in sorted(ai.depth_times.items())},
+    }
+
+
+def run(board_class, depths, time_limits, options):
+    """
+    Run every position at every fixed depth and every time limit.
+
+    Returns:
+        dict: The individual runs keyed by "position/depth-N" or "position/time-T",
+            and a summary over all of them.
+    """
+    runs = {}
+    for name, moves, reference in POSITIONS:
+        for depth in depths:
+            runs[f"{name}/depth-{depth}"] = run_position(board_class, moves, reference, 'depth', depth, options)
+        for limit in time_limits:
+            runs[f"{name}/time-{limit:g}"] = run_position(board_class, moves, reference, 'time', limit, options)
+    nodes = sum(r['nodes'] for r in runs.values())
+    seconds = sum(r['seconds'] for r in runs.values())
+    summary = {
+        'runs': len(runs),
+        'nodes': nodes,
+        'seconds': round(seconds, 4),
+        'nps': round(nodes / seconds) if seconds else 0,
+        'agreement': sum(r['agree'] for r in runs.values()),
+    }
+    return {'runs': runs, 'summary': summary}
+
+
+def commit_id():
+    """The current git commit, or None outside a repository."""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(old, new):
+    """Print the change in nodes per second and agreement of every run found in both results."""
+    for key, run_new in new['runs'].items():
+        run_old = old['runs'].get(key)
+        if run_old is None:
+            continue
+        ratio = run_new['nps'] / run_old['nps'] if run_old['nps'] else float('inf')
+        changed = '' if run_new['move'] == run_old['move'] else f", move {run_old['move']} -> {run_new['move']}"
+        print(f"{key:16} nodes {run_old['nodes']:>9} -> {run_new['nodes']:>9}, "
+              f"nps {run_old['nps']:>7} -> {run_new['nps']:>7} ({ratio:.2f}x){changed}")
+    print(f"agreement {old['summary']['agreement']} -> {new['summary']['agreement']} "
+          f"of {new['summary']['runs']}, nps {old['summary']['nps']} -> {new['summary']['nps']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the search on fixed positions.")
+    parser.add_argument('--depths', type=int, nargs='*', default=[4, 6])
+    parser.add_argument('--time', type=float, nargs='*', default=[1.0], help="time limits in seconds")
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default='bitboard')
+    parser.add_argument('--algorithm', choices=ALGORITHMS, default='alphabeta')
+    parser.add_argument('--endgame-threshold', type=int, default=12)
+    parser.add_argument('--out', default='bench.json')
+    parser.add_argument('--compare', help="an earlier result file to compare with")
+    args = parser.parse_args()
+
+    options = {'algorithm': args.algorithm, 'endgame_threshold': args.endgame_threshold}
+    result = run(BACKENDS[args.backend], args.depths, args.time, options)
+    result['config'] = dict(options, backend=args.backend, depths=args.depths, time_limits=args.time)
+    result['commit'] = commit_id()
+    result['python'] = platform.python_version()
+    with open(args.out, 'w') as f:
+        json.dump(result, f, indent=2, sort_keys=True)
+        f.write('\n')
+    summary = result['summary']
+    print(f"{summary['runs']} runs: {summary['nodes']} nodes in {summary['seconds']:.2f}s "
+          f"({summary['nps']} nodes/s), {summary['agreement']} agree with the reference; wrote {args.out}")
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), result)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,240 @@
+from fliptable import table_flips
+from othelo import SQUARES
+
+FULL = 0xFFFFFFFFFFFFFFFF
+NOT_A_FILE = 0xFEFEFEFEFEFEFEFE  # every square except column 0
+NOT_H_FILE = 0x7F7F7F7F7F7F7F7F  # every square except column 7
+INNER_FILES = NOT_A_FILE & NOT_H_FILE
+
+# Square (row, col) is bit row * 8 + col.  Each direction is a shift amount and
+# the mask that removes the squares which wrapped around an edge of the board.
+LEFT_SHIFTS = [(1, NOT_A_FILE), (7, NOT_H_FILE), (8, FULL), (9, NOT_A_FILE)]
+RIGHT_SHIFTS = [(1, NOT_H_FILE), (7, NOT_A_FILE), (8, FULL), (9, NOT_H_FILE)]
+
+
+def move_mask(own, opp):
+    """
+    Generate the legal moves for a side with shift-and-mask direction fills.
+
+    Each direction is unrolled and fills the opponent runs with doubling shifts
+    (one, one, two and two squares), which covers the longest run of six discs in
+    fewer operations than six single steps.
+
+    Parameters:
+        own (int): Bitboard of the side to move.
+        opp (int): Bitboard of the opponent.
+
+    Returns:
+        int: Bitboard with one bit set for every legal move.
+    """
+    # Opponent discs that can be flanked sideways; a run never wraps past the A or H file
+    inner = opp & INNER_FILES
+    # Left shifts: east (1), south-west (7), south (8), south-east (9)
+    t = inner & (own << 1)
+    t |= inner & (t << 1)
+    pre = inner & (inner << 1)
+    t |= pre & (t << 2)
+    t |= pre & (t << 2)
+    moves = t << 1
+    t = inner & (own << 7)
+    t |= inner & (t << 7)
+    pre = inner & (inner << 7)
+    t |= pre & (t << 14)
+    t |= pre & (t << 14)
+    moves |= t << 7
+    t = opp & (own << 8)
+    t |= opp & (t << 8)
+    pre = opp & (opp << 8)
+    t |= pre & (t << 16)
+    t |= pre & (t << 16)
+    moves |= t << 8
+    t = inner & (own << 9)
+    t |= inner & (t << 9)
+    pre = inner & (inner << 9)
+    t |= pre & (t << 18)
+    t |= pre & (t << 18)
+    moves |= t << 9
+    # Right shifts: west (1), north-east (7), north (8), north-west (9)
+    t = inner & (own >> 1)
+    t |= inner & (t >> 1)
+    pre = inner & (inner >> 1)
+    t |= pre & (t >> 2)
+    t |= pre & (t >> 2)
+    moves |= t >> 1
+    t = inner & (own >> 7)
+    t |= inner & (t >> 7)
+    pre = inner & (inner >> 7)
+    t |= pre & (t >> 14)
+    t |= pre & (t >> 14)
+    moves |= t >> 7
+    t = opp & (own >> 8)
+    t |= opp & (t >> 8)
+    pre = opp & (opp >> 8)
+    t |= pre & (t >> 16)
+    t |= pre & (t >> 16)
+    moves |= t >> 8
+    t = inner & (own >> 9)
+    t |= inner & (t >> 9)
+    pre = inner & (inner >> 9)
+    t |= pre & (t >> 18)
+    t |= pre & (t >> 18)
+    moves |= t >> 9
+    return moves & ~(own | opp) & FULL
+
+
+def flip_mask(bit, own, opp):
+    """
+    Compute the discs flipped by placing a disc on the given square.
+
+    Parameters:
+        bit (int): Single-bit bitboard of the square being played.
+        own (int): Bitboard of the side to move.
+        opp (int): Bitboard of the opponent.
+
+    Returns:
+        int: Bitboard of the flipped discs (0 if the move is illegal).
+    """
+    flips = 0
+    for shift, mask in LEFT_SHIFTS:
+        line = 0
+        x = (bit << shift) & mask
+        while x & opp:
+            line |= x
+            x = (x << shift) & mask
+        if x & own:
+            flips |= line
+    for shift, mask in RIGHT_SHIFTS:
+        line = 0
+        x = (bit >> shift) & mask
+        while x & opp:
+            line |= x
+            x = (x >> shift) & mask
+        if x & own:
+            flips |= line
+    return flips
+
+
+# ROW_MOVES[row][byte] holds the (row, col) tuples of the set bits of one row's byte
+ROW_MOVES = [[tuple(SQUARES[row * 8 + col] for col in range(8) if byte >> col & 1) for byte in range(256)]
+             for row in range(8)]
+
+
+def mask_to_moves(mask):
+    """Convert a bitboard of squares into a list of (row, col) tuples, one row at a time."""
+    moves = []
+    for row_moves in ROW_MOVES:
+        if not mask:
+            break
+        if mask & 0xFF:
+            moves += row_moves[mask & 0xFF]
+        mask >>= 8
+    return moves
+
+
+class BitboardOthello:
+    """
+    Othello board that stores each side as a 64-bit integer.
+
+    It exposes the same interface as Othello, so OthelloAI and play_othello can
+    run on either backend.
+    """
+
+    def __init__(self):
+        # Indexed by player: discs[1] is player 1 and discs[-1] is player 2.
+        self.discs = [0, 0, 0]
+        self.discs[1] = (1 << 27) | (1 << 36)
+        self.discs[-1] = (1 << 28) | (1 << 35)
+        self.current_player = 1
+
+    @classmethod
+    def from_bits(cls, p1, p2, player):
+        """
+        Build a board from the bitboards of both sides, e.g. as sent to a worker process.
+
+        Parameters:
+            p1 (int): Bitboard of player 1.
+            p2 (int): Bitboard of player 2.
+            player (int): The player to move.
+        """
+        game = cls()
+        game.discs = [0, p1, p2]
+        game.current_player = player
+        return game
+
+    @property
+    def board(self):
+        """The board as a flat list indexed by row * 8 + col, like Othello.board."""
+        return [self.square(r, c) for r in range(8) for c in range(8)]
+
+    def print_board(self):
+        board = self.board
+        for r in range(8):
+            print(' '.join(['.' if x == 0 else 'X' if x == 1 else 'O' for x in board[r * 8:r * 8 + 8]]))
+        print()
+
+    def move_mask(self, player):
+        return move_mask(self.discs[player], self.discs[-player])
+
+    def valid_moves(self, player):
+        return mask_to_moves(move_mask(self.discs[player], self.discs[-player]))
+
+    def mobility(self, player):
+        return move_mask(self.discs[player], self.discs[-player]).bit_count()
+
+    def make_move(self, row, col, player):
+        self.apply_move((row, col), player)
+
+    def apply_move(self, move, player):
+        """
+        Apply the move to the board and return the discs that were flipped.
+
+        Parameters:
+            move (tuple): The move to apply.
+            player (int): The player making the move.
+
+        Returns:
+            int: Bitboard of the flipped discs.
+        """
+        sq = move[0] * 8 + move[1]
+        bit = 1 << sq
+        discs = self.discs
+        flips = table_flips(sq, discs[player], discs[-player])
+        discs[player] |= flips | bit
+        discs[-player] ^= flips
+        return flips
+
+    def undo_move(self, move, player, flips):
+        """
+        Undo the move and revert the flipped discs.
+
+        Parameters:
+            move (tuple): The move to undo.
+            player (int): The player who made the move.
+            flips (int): The bitboard returned by apply_move.
+        """
+        bit = 1 << (move[0] * 8 + move[1])
+        discs = self.discs
+        discs[player] ^= flips | bit
+        discs[-player] |= flips
+
+    def square(self, row, col):
+        bit = 1 << (row * 8 + col)
+        if self.discs[1] & bit:
+            return 1
+        if self.discs[-1] & bit:
+            return -1
+        return 0
+
+    def count(self, player):
+        if player == 0:
+            return self.empty_count()
+        return self.discs[player].bit_count()
+
+    def empty_count(self):
+        return 64 - (self.discs[1] | self.discs[-1]).bit_count()
+
+    def has_valid_move(self, player):
+        return move_mask(self.discs[player], self.discs[-player]) != 0
+
+    def switch_player(self):
+        self.current_player *= -1
@@ -0,0 +1,169 @@
+"""
+Opening book stored as a sorted binary file and searched through mmap.
+
+Build a book with:
+    python book.py --games 200 --plies 12 --depth 8 --out book.bin
+"""
+import argparse
+import mmap
+import random
+import struct
+
+from bitboard import BitboardOthello
+from bot import OthelloAI
+from symmetry import INVERSE, transform_move
+from transposition import canonical_key, symmetric_keys
+
+BOOK_MAGIC = b'OTBK'
+BOOK_VERSION = 2
+# magic, version, reserved, number of records
+BOOK_HEADER = struct.Struct('<4sHHQ')
+# canonical position key, move square in the canonical orientation, padding, score
+BOOK_RECORD = struct.Struct('<QBxxxf')
+
+
+def book_key(game, player):
+    """
+    Key of a position in the book, shared by all 8 symmetric images of the position.
+
+    Returns:
+        tuple: (key, sym) where sym maps the board to the orientation of the book moves.
+    """
+    return canonical_key(symmetric_keys(game), player)
+
+
+def write_book(path, entries):
+    """
+    Write book entries to a file, sorted by key.
+
+    Parameters:
+        path (str): The file to write.
+        entries (dict): {position key: (move in the canonical orientation, score)}.
+    """
+    with open(path, 'wb') as f:
+        f.write(BOOK_HEADER.pack(BOOK_MAGIC, BOOK_VERSION, 0, len(entries)))
+        for key in sorted(entries):
+            move, score = entries[key]
+            f.write(BOOK_RECORD.pack(key, move[0] * 8 + move[1], score))
+
+
+def build_book(games, plies, depth, explore=0.3, seed=0):
+    """
+    Expand opening positions by self-play and evaluate each one with a deep search.
+
+    Every game follows the best moves found so far and deviates with a random move
+    with probability explore, so the book grows around the main lines.
+
+    Parameters:
+        games (int): Number of self-play games.
+        plies (int): Number of moves of each game that go into the book.
+        depth (int): Search depth used to find the best move of each position.
+        explore (float): Probability of playing a random move instead of the book move.
+        seed (int): Seed of the random deviations.
+
+    Returns:
+        dict: {position key: (move in the canonical orientation, score)} for every position reached.
+    """
+    rng = random.Random(seed)
+    entries = {}
+    for _ in range(games):
+        game = BitboardOthello()
+        ai = OthelloAI(game)
+        for _ in range(plies):
+            player = game.current_player
+            valid_moves = game.valid_moves(player)
+            if not valid_moves:
+                if not game.has_valid_move(-player):
+                    break
+                game.switch_player()
+                continue
+            key, sym = book_key(game, player)
+            if key not in entries:
+                move = ai.search(max_depth=depth)
+                entries[key] = (transform_move(move, sym), ai.best_eval)
+            move = transform_move(entries[key][0], INVERSE[sym])
+            if rng.random() < explore:
+                move = rng.choice(valid_moves)
+            game.make_move(move[0], move[1], player)
+            game.switch_player()
+    return entries
+
+
+class OpeningBook:
+    """
+    Read-only opening book backed by a memory-mapped file.
+
+    Lookups binary-search the sorted records in place, so opening a book costs no
+    memory beyond the pages the operating system shares between processes.
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, count = BOOK_HEADER.unpack_from(self._mmap)
+        if magic != BOOK_MAGIC or version != BOOK_VERSION:
+            raise ValueError(f"{path} is not an opening book")
+        if len(self._mmap) != BOOK_HEADER.size + count * BOOK_RECORD.size:
+            raise ValueError(f"{path} is truncated")
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def probe(self, key):
+        """
+        Find a position key in the book.
+
+        Returns:
+            tuple: (move in the canonical orientation, score) or None if the position
+                is not in the book.
+        """
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            record_key, square, score = BOOK_RECORD.unpack_from(self._mmap, BOOK_HEADER.size + mid * BOOK_RECORD.size)
+            if record_key < key:
+                lo = mid + 1
+            elif record_key > key:
+                hi = mid
+            else:
+                return divmod(square, 8), score
+        return None
+
+    def lookup(self, game, player):
+        """
+        Find the book move of the current position.
+
+        Parameters:
+            game: The board, either Othello or BitboardOthello.
+            player (int): The player to move.
+
+        Returns:
+            tuple: (move, score), or None if the position is not in the book.
+        """
+        key, sym = book_key(game, player)
+        entry = self.probe(key)
+        if entry is None:
+            return None
+        move = transform_move(entry[0], INVERSE[sym])
+        if move not in game.valid_moves(player):
+            return None
+        return move, entry[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build an opening book by self-play and deep search.")
+    parser.add_argument('--games', type=int, default=200)
+    parser.add_argument('--plies', type=int, default=12)
+    parser.add_argument('--depth', type=int, default=8)
+    parser.add_argument('--explore', type=float, default=0.3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default='book.bin')
+    args = parser.parse_args()
+    entries = build_book(args.games, args.plies, args.depth, args.explore, args.seed)
+    write_book(args.out, entries)
+    print(f"wrote {len(entries)} positions to {args.out}")
+
+
+if __name__ == '__main__':
+    main()
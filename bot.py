@@ -1,6 +1,125 @@
+import time
+
+from endgame import EndgameSolver
+from evaluation import EvalState
+from ordering import MoveOrderer
+from stats import SearchStats, instrument
+from symmetry import INVERSE, transform_move
+from transposition import (EXACT, LOWER, UPPER, SIDE_KEY, TranspositionTable, canonical_key, move_delta,
+                           symmetric_keys, symmetric_move_keys, zobrist_hash)
+
+ALGORITHMS = ('alphabeta', 'pvs', 'mtdf')
+
+# Width of the zero windows used by PVS and MTD(f); evaluations are not restricted to integers.
+NULL_WINDOW = 1e-6
+
+
 class OthelloAI:
-    def __init__(self, game):
+    def __init__(self, game, tt_size_mb=16, tt_replacement='depth', check_interval=1024, orderer=None,
+                 algorithm='alphabeta', endgame_threshold=12, evaluator=None, book=None,
+                 canonical=False, tt=None, stats=False):
+        """
+        Parameters:
+            game: The board to search, either Othello or BitboardOthello.
+            tt_size_mb (float): Size of the transposition table in megabytes, or None to disable it.
+            tt_replacement (str): Replacement policy of the transposition table ('depth' or 'always').
+            check_interval (int): Number of nodes between two deadline checks inside the search.
+            orderer: Move-ordering stage, a MoveOrderer by default.
+            algorithm (str): 'alphabeta' for minimax with alpha-beta pruning, 'pvs' for
+                Principal Variation Search in negamax form, 'mtdf' for MTD(f) on top of
+                the transposition table.
+            endgame_threshold (int): Number of empty squares at or below which the exact
+                endgame solver replaces the heuristic search, or 0 to disable it.
+            evaluator: A PatternEvaluator that replaces the hand-written weights of
+                evaluate_board, or None.
+            book: An OpeningBook consulted by search before any searching, or None.
+            canonical (bool): Key the transposition table by position up to the 8 board
+                symmetries, so symmetric positions share their entries.
+            tt: An existing table to use instead of creating one, e.g. a
+                SharedTranspositionTable shared with other processes.
+            stats (bool): Collect a SearchStats in self.stats. The hot methods are then
+                replaced by instrumented wrappers; without stats they run untouched.
+        """
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"Unknown search algorithm: {algorithm}")
+        if algorithm == 'mtdf' and not tt_size_mb and tt is None:
+            raise ValueError("MTD(f) needs a transposition table")
+        self.algorithm = algorithm
         self.game = game
+        if tt is None and tt_size_mb:
+            tt = TranspositionTable(tt_size_mb, tt_replacement)
+        self.tt = tt
+        self.hash = zobrist_hash(game)
+        self._hash_stack = []
+        # Keys of the 8 symmetric images of the board when the table is canonical
+        self.sym_keys = symmetric_keys(game) if canonical else None
+        self._sym_stack = []
+        self.evaluator = evaluator
+        self.eval_state = EvalState(game, track_patterns=evaluator is not None)
+        self._root_key = None
+        self.check_interval = check_interval
+        self.deadline = None
+        self.stopped = False
+        self.nodes = 0
+        self._next_check = check_interval
+        # Principal variation of the last completed depth, and its moves by table key
+        # in the orientation of the table
+        self.pv = []
+        self._pv_moves = {}
+        self.best_eval = None
+        self.completed_depth = 0
+        self.orderer = orderer if orderer is not None else MoveOrderer()
+        # Nodes searched by the last best_move call at each depth
+        self.depth_nodes = {}
+        # Seconds from the start of the last search until each depth was completed
+        self.depth_times = {}
+        # Zero-window passes MTD(f) needed at each depth
+        self.mtdf_passes = {}
+        self.endgame_threshold = endgame_threshold
+        self.endgame = EndgameSolver()
+        self.endgame_result = None
+        self.book = book
+        self.stats = None
+        if stats:
+            self.stats = SearchStats()
+            instrument(self, self.stats)
+
+    def _check_time(self):
+        self._next_check = self.nodes + self.check_interval
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            self.stopped = True
+
+    def sync(self):
+        """Rebuild the Zobrist key and the evaluation state from the board."""
+        self.hash = zobrist_hash(self.game)
+        self._hash_stack.clear()
+        if self.sym_keys is not None:
+            self.sym_keys = symmetric_keys(self.game)
+            self._sym_stack.clear()
+        self.eval_state.reset(self.game)
+
+    def position_key(self, player):
+        """Zobrist key of the current position with the given player to move."""
+        return self.hash ^ SIDE_KEY if player == -1 else self.hash
+
+    def table_key(self, player):
+        """
+        Key of the current position in the transposition table.
+
+        Returns:
+            tuple: (key, sym) where sym is the symmetry that maps the board to the
+                orientation stored in the table (always 0 unless canonical is set).
+        """
+        if self.sym_keys is not None:
+            return canonical_key(self.sym_keys, player)
+        return self.position_key(player), 0
+
+    def _first_move(self, key, sym, tt_move):
+        """The move to search first: the previous principal variation's, else the stored best move."""
+        pv_move = self._pv_moves.get(key)
+        if pv_move is None:
+            return tt_move
+        return transform_move(pv_move, INVERSE[sym]) if sym else pv_move
 
     def minimax(self, depth, maximizing_player, alpha=float('-inf'), beta=float('inf')):
         """
@@ -15,101 +134,260 @@ class OthelloAI:
         Returns:
             float: The evaluation score of the best move.
         """
-        valid_moves = self.game.valid_moves(self.game.current_player if maximizing_player else -self.game.current_player)
-        
-        # Base case: depth limit or no valid moves
-        if depth == 0 or not valid_moves:
+        self.nodes += 1
+        if self.nodes >= self._next_check:
+            self._check_time()
+        if self.stopped:
+            return 0
+
+        player = self.game.current_player if maximizing_player else -self.game.current_player
+        # The table stores values from the side to move's perspective, the search from the AI's.
+        sign = 1 if maximizing_player else -1
+        alpha_orig, beta_orig = alpha, beta
+        tt_move = None
+        key, sym = self.table_key(player)
+        if self.tt is not None:
+            entry = self.tt.probe(key, sym)
+            if entry is not None:
+                tt_depth, bound, value, tt_move = entry
+                if tt_depth >= depth:
+                    value *= sign
+                    if bound == EXACT:
+                        return value
+                    if (bound == LOWER) == maximizing_player:
+                        alpha = max(alpha, value)
+                    else:
+                        beta = min(beta, value)
+                    if beta <= alpha:
+                        return value
+
+        # Base case: depth limit or no valid moves. A leaf is evaluated without
+        # generating its move list; the evaluation only needs the mobility counts.
+        if depth == 0:
+            return self.evaluate_board()
+        valid_moves = self.game.valid_moves(player)
+        if not valid_moves:
             return self.evaluate_board()
 
+        # Search the previous principal variation first, then the stored best move
+        ply = len(self._hash_stack)
+        self.orderer.order(valid_moves, player, ply, self._first_move(key, sym, tt_move))
+
+        best_move = None
         if maximizing_player:
-            max_eval = float('-inf')
+            best_eval = float('-inf')
             for move in valid_moves:
-                flip_positions = self.apply_move(move, self.game.current_player)
+                flip_positions = self.apply_move(move, player)
                 eval = self.minimax(depth - 1, False, alpha, beta)
-                self.undo_move(move, self.game.current_player, flip_positions)
+                self.undo_move(move, player, flip_positions)
+                if self.stopped:
+                    return 0
                 
-                max_eval = max(max_eval, eval)
+                if eval > best_eval:
+                    best_eval = eval
+                    best_move = move
                 alpha = max(alpha, eval)
                 if beta <= alpha:
+                    self.orderer.update(move, player, ply, depth)
                     break  # Beta cut-off
-            
-            return max_eval
         
         else:
-            min_eval = float('inf')
+            best_eval = float('inf')
             for move in valid_moves:
-                flip_positions = self.apply_move(move, -self.game.current_player)
+                flip_positions = self.apply_move(move, player)
                 eval = self.minimax(depth - 1, True, alpha, beta)
-                self.undo_move(move, -self.game.current_player, flip_positions)
+                self.undo_move(move, player, flip_positions)
+                if self.stopped:
+                    return 0
                 
-                min_eval = min(min_eval, eval)
+                if eval < best_eval:
+                    best_eval = eval
+                    best_move = move
                 beta = min(beta, eval)
                 if beta <= alpha:
+                    self.orderer.update(move, player, ply, depth)
                     break  # Alpha cut-off
-            
-            return min_eval
+
+        if self.tt is not None:
+            if best_eval <= alpha_orig:
+                bound = UPPER if maximizing_player else LOWER
+            elif best_eval >= beta_orig:
+                bound = LOWER if maximizing_player else UPPER
+            else:
+                bound = EXACT
+            self.tt.store(key, depth, bound, sign * best_eval, best_move, sym)
+
+        return best_eval
+
+    def pvs(self, depth, player, alpha=float('-inf'), beta=float('inf')):
+        """
+        Principal Variation Search (NegaScout) in negamax form.
+
+        The first move is searched with the full window and the others with a
+        zero window around alpha; a move is re-searched only when it fails high.
+
+        Parameters:
+            depth (int): The maximum depth of the search tree.
+            player (int): The player to move.
+            alpha (float): The best value the player to move can guarantee so far.
+            beta (float): The best value the opponent can guarantee so far.
+
+        Returns:
+            float: The evaluation score of the best move, from the perspective of the player to move.
+        """
+        self.nodes += 1
+        if self.nodes >= self._next_check:
+            self._check_time()
+        if self.stopped:
+            return 0
+
+        alpha_orig = alpha
+        tt_move = None
+        key, sym = self.table_key(player)
+        if self.tt is not None:
+            entry = self.tt.probe(key, sym)
+            if entry is not None:
+                tt_depth, bound, value, tt_move = entry
+                if tt_depth >= depth:
+                    if bound == EXACT:
+                        return value
+                    if bound == LOWER:
+                        alpha = max(alpha, value)
+                    else:
+                        beta = min(beta, value)
+                    if beta <= alpha:
+                        return value
+
+        # Base case: depth limit or no valid moves, evaluated as in minimax
+        valid_moves = self.game.valid_moves(player) if depth else None
+        if not valid_moves:
+            score = self.evaluate_board()
+            return score if player == self.game.current_player else -score
+
+        ply = len(self._hash_stack)
+        self.orderer.order(valid_moves, player, ply, self._first_move(key, sym, tt_move))
+
+        best_eval = float('-inf')
+        best_move = None
+        for move in valid_moves:
+            flip_positions = self.apply_move(move, player)
+            if best_move is None:
+                eval = -self.pvs(depth - 1, -player, -beta, -alpha)
+            else:
+                eval = -self.pvs(depth - 1, -player, -alpha - NULL_WINDOW, -alpha)
+                if alpha < eval < beta:
+                    eval = -self.pvs(depth - 1, -player, -beta, -eval)
+            self.undo_move(move, player, flip_positions)
+            if self.stopped:
+                return 0
+
+            if eval > best_eval:
+                best_eval = eval
+                best_move = move
+            alpha = max(alpha, eval)
+            if beta <= alpha:
+                self.orderer.update(move, player, ply, depth)
+                break  # Beta cut-off
+
+        if self.tt is not None:
+            if best_eval <= alpha_orig:
+                bound = UPPER
+            elif best_eval >= beta:
+                bound = LOWER
+            else:
+                bound = EXACT
+            # A fail-low says nothing about the best move, so keep the stored one
+            self.tt.store(key, depth, bound, best_eval, tt_move if bound == UPPER else best_move, sym)
+
+        return best_eval
+
+    def mtdf(self, depth, guess=0):
+        """
+        MTD(f): converge on the minimax value with repeated zero-window searches.
+
+        With a zero window pvs never re-searches, so it acts as the memory-enhanced
+        alpha-beta core; the transposition table carries the work between passes.
+
+        Parameters:
+            depth (int): The maximum depth of the search tree.
+            guess (float): First guess of the value, e.g. the result of the previous depth.
+
+        Returns:
+            tuple: (value of the current position for the AI, best move). The move is
+                the root's stored move after the last pass that failed high; a pass
+                that fails low only proves that no move reaches beta.
+        """
+        player = self.game.current_player
+        key, sym = self.table_key(player)
+        lower, upper = float('-inf'), float('inf')
+        g = guess
+        best_move = None
+        passes = 0
+        while lower < upper:
+            beta = g + NULL_WINDOW if g == lower else g
+            g = self.pvs(depth, player, beta - NULL_WINDOW, beta)
+            passes += 1
+            if self.stopped:
+                break
+            if g < beta:
+                upper = g
+            else:
+                lower = g
+                entry = self.tt.probe(key, sym)
+                if entry is not None:
+                    best_move = entry[3]
+        self.mtdf_passes[depth] = passes
+        return g, best_move
 
     def evaluate_board(self):
         """
         Evaluates the current board state from the perspective of the AI player.
+
+        The disc, corner and edge terms come from eval_state, which apply_move and
+        undo_move keep up to date; only mobility is computed here. With a pattern
+        evaluator the score is looked up from its weight tables instead.
         
         Returns:
             float: A score representing the desirability of the board state.
         """
+        player = self.game.current_player
+        state = self.eval_state
+        if self.evaluator is not None:
+            return self.evaluator.evaluate(state, player)
         score = 0
         
         # Coin Parity
-        player_disk_count = sum(row.count(self.game.current_player) for row in self.game.board)
-        opponent_disk_count = sum(row.count(-self.game.current_player) for row in self.game.board)
-        coin_parity = player_disk_count - opponent_disk_count
-        score += coin_parity
+        score += state.discs[player] - state.discs[-player]
         
         # Mobility
-        player_valid_moves = len(self.game.valid_moves(self.game.current_player))
-        opponent_valid_moves = len(self.game.valid_moves(-self.game.current_player))
-        mobility = player_valid_moves - opponent_valid_moves
-        score += 2 * mobility
+        score += 2 * (self.game.mobility(player) - self.game.mobility(-player))
         
         # Corner Occupancy
-        corners = [(0, 0), (0, 7), (7, 0), (7, 7)]
-        corner_occupancy = sum(self.game.board[r][c] for r, c in corners)
-        score += 5 * corner_occupancy
+        score += 5 * state.corners * player
         
         # Edge Occupancy
-        edge_occupancy = sum(self.game.board[i][j] for i in [0, 7] for j in range(1, 7)) + \
-                         sum(self.game.board[i][j] for i in range(1, 7) for j in [0, 7])
-        score += 2.5 * edge_occupancy
+        score += 2.5 * state.edges * player
         
         return score
 
     def apply_move(self, move, player):
         """
-        Apply the move to the board and return the positions of the pieces that will be flipped.
+        Apply the move to the board and return the positions of the pieces that were flipped.
 
         Parameters:
             move (tuple): The move to apply.
             player (int): The player making the move.
 
         Returns:
-            list: The positions of the pieces that will be flipped.
-        """
-        row, col = move
-        flip_positions = []
-        self.game.board[row][col] = player
-        directions = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
-        for dr, dc in directions:
-            nr, nc = row + dr, col + dc
-            if 0 <= nr < 8 and 0 <= nc < 8 and self.game.board[nr][nc] == -player:
-                temp_flip_positions = []
-                while 0 <= nr < 8 and 0 <= nc < 8:
-                    if self.game.board[nr][nc] == 0:
-                        break
-                    if self.game.board[nr][nc] == player:
-                        flip_positions.extend(temp_flip_positions)
-                        break
-                    temp_flip_positions.append((nr, nc))
-                    nr += dr
-                    nc += dc
+            The flipped pieces, in the representation of the board backend.
+        """
+        flip_positions = self.game.apply_move(move, player)
+        self._hash_stack.append(self.hash)
+        self.hash ^= move_delta(move, player, flip_positions)
+        if self.sym_keys is not None:
+            self._sym_stack.append(self.sym_keys)
+            self.sym_keys = symmetric_move_keys(self.sym_keys, move, player, flip_positions)
+        self.eval_state.apply(move, player, flip_positions)
         return flip_positions
 
     def undo_move(self, move, player, flip_positions):
@@ -119,32 +397,215 @@ class OthelloAI:
         Parameters:
             move (tuple): The move to undo.
             player (int): The player who made the move.
-            flip_positions (list): The positions of the pieces that were flipped.
+            flip_positions: The flipped pieces returned by apply_move.
         """
-        row, col = move
-        self.game.board[row][col] = 0
-        for fr, fc in flip_positions:
-            self.game.board[fr][fc] = -player
+        self.game.undo_move(move, player, flip_positions)
+        self.hash = self._hash_stack.pop()
+        if self.sym_keys is not None:
+            self.sym_keys = self._sym_stack.pop()
+        self.eval_state.undo()
 
     def best_move(self, depth):
         """
         Determine the best move for the AI by evaluating all possible moves.
 
+        The search always stops at the given depth; only search() hands endgames
+        to the exact solver.
+
         Parameters:
             depth (int): The maximum depth of the search tree.
 
         Returns:
-            tuple: The best move for the AI.
+            tuple: The best move for the AI, or None if the search was stopped by the deadline.
         """
+        self.stopped = False
+        player = self.game.current_player
+        # The board may have changed since the last call
+        self.sync()
+        valid_moves = self.game.valid_moves(player)
+        key, sym = self.table_key(player)
+        same_root = key == self._root_key
+        if not same_root:
+            if self.tt is not None:
+                self.tt.new_search()
+            self.orderer.new_search()
+            self._root_key = key
+        tt_move = None
+        if self.tt is not None:
+            entry = self.tt.probe(key, sym)
+            if entry is not None:
+                tt_move = entry[3]
+        self.orderer.order(valid_moves, player, 0, self._first_move(key, sym, tt_move))
+        start_nodes = self.nodes
+
+        if self.algorithm == 'mtdf':
+            guess = self.best_eval if same_root and self.best_eval is not None else 0
+            best_eval, best_move = self.mtdf(depth, guess)
+            if self.stopped:
+                return None
+            if best_move not in valid_moves:
+                best_move = valid_moves[0] if valid_moves else None
+            self.depth_nodes[depth] = self.nodes - start_nodes
+            self.best_eval = best_eval
+            return best_move
+
         best_eval = float('-inf')
         best_move = None
-        for move in self.game.valid_moves(self.game.current_player):
-            flip_positions = self.apply_move(move, self.game.current_player)
-            self.game.switch_player()
-            eval = self.minimax(depth - 1, False)
-            self.game.switch_player()
-            self.undo_move(move, self.game.current_player, flip_positions)
+        for move in valid_moves:
+            flip_positions = self.apply_move(move, player)
+            if self.algorithm == 'pvs':
+                if best_move is None:
+                    eval = -self.pvs(depth - 1, -player)
+                else:
+                    eval = -self.pvs(depth - 1, -player, -best_eval - NULL_WINDOW, -best_eval)
+                    if eval > best_eval:
+                        eval = -self.pvs(depth - 1, -player, float('-inf'), -eval)
+            else:
+                eval = self.minimax(depth - 1, False, best_eval)
+            self.undo_move(move, player, flip_positions)
+            if self.stopped:
+                return None
             if eval > best_eval:
                 best_eval = eval
                 best_move = move
+        if self.tt is not None and best_move is not None:
+            self.tt.store(key, depth, EXACT, best_eval, best_move, sym)
+        self.depth_nodes[depth] = self.nodes - start_nodes
+        self.best_eval = best_eval
+        return best_move
+
+    def solve_endgame(self, deadline=None):
+        """
+        Solve the current position exactly with the endgame solver.
+
+        Parameters:
+            deadline (float): time.monotonic() value at which to give up, or None.
+
+        Returns:
+            EndgameResult: The exact score, best move and outcome, or None if the deadline was reached.
+        """
+        result = self.endgame.solve(self.game, self.game.current_player, deadline=deadline)
+        self.endgame_result = result
+        if result is not None:
+            self.best_eval = result.score
+        return result
+
+    def effective_branching_factor(self):
+        """
+        Average growth of the node count from one depth to the next in depth_nodes.
+
+        Returns:
+            float: The effective branching factor, or None with fewer than two depths.
+        """
+        depths = sorted(d for d, n in self.depth_nodes.items() if n)
+        if len(depths) < 2:
+            return None
+        first, last = depths[0], depths[-1]
+        return (self.depth_nodes[last] / self.depth_nodes[first]) ** (1 / (last - first))
+
+    def principal_variation(self, depth):
+        """
+        Follow the best moves stored in the transposition table from the current position.
+
+        Parameters:
+            depth (int): The maximum length of the variation.
+
+        Returns:
+            list: The moves of the principal variation.
+        """
+        return [move for _, _, move in self._walk_pv(depth)]
+
+    def _walk_pv(self, depth):
+        """Return (table key, symmetry, move) along the principal variation."""
+        if self.tt is None:
+            return []
+        pv = []
+        undo = []
+        player = self.game.current_player
+        while len(pv) < depth:
+            key, sym = self.table_key(player)
+            entry = self.tt.probe(key, sym)
+            if entry is None or entry[3] is None or entry[3] not in self.game.valid_moves(player):
+                break
+            pv.append((key, sym, entry[3]))
+            undo.append((entry[3], player, self.apply_move(entry[3], player)))
+            player = -player
+        for move, mover, flip_positions in reversed(undo):
+            self.undo_move(move, mover, flip_positions)
+        return pv
+
+    def search(self, time_limit=None, max_depth=None, start_depth=1):
+        """
+        Iterative deepening search bounded by wall-clock time and depth.
+
+        The deadline is checked inside minimax every check_interval nodes; an
+        interrupted depth is discarded and the move of the last completed depth
+        is returned. Each depth searches the previous principal variation first.
+
+        Parameters:
+            time_limit (float): Seconds available for the move, or None for no limit.
+            max_depth (int): The deepest iteration to run, or None to search until
+                the end of the game or the deadline.
+            start_depth (int): The first iteration to run.
+
+        Returns:
+            tuple: The best move for the AI, or None if it has no valid move.
+        """
+        start = time.monotonic()
+        if self.stats is not None:
+            self.stats.reset()
+        self.nodes = 0
+        self._next_check = self.check_interval
+        self.pv = []
+        self._pv_moves = {}
+        self.completed_depth = 0
+        self.depth_nodes = {}
+        self.depth_times = {}
+        self.mtdf_passes = {}
+        self.endgame_result = None
+        valid_moves = self.game.valid_moves(self.game.current_player)
+        if not valid_moves:
+            return None
+        if self.book is not None:
+            entry = self.book.lookup(self.game, self.game.current_player)
+            if entry is not None:
+                self.best_eval = entry[1]
+                return entry[0]
+        empties = self.game.empty_count()
+        if max_depth is None:
+            max_depth = empties
+        if empties <= self.endgame_threshold:
+            # Give the exact solver half of the budget, then fall back to the heuristic search
+            deadline = start + time_limit / 2 if time_limit is not None else None
+            result = self.solve_endgame(deadline)
+            # The solver's nodes count towards the search, whether it finished or not
+            self.nodes = self.endgame.nodes
+            self._next_check = self.nodes + self.check_interval
+            if self.stats is not None:
+                self.stats.nodes += self.endgame.nodes
+            if result is not None:
+                self.completed_depth = empties
+                self.depth_nodes = {empties: self.endgame.nodes}
+                self.depth_times = {empties: time.monotonic() - start}
+                if result.move is not None:
+                    self.pv = [result.move]
+                return result.move
+
+        # Both deadlines count from the start, so the solver's time comes out of the same budget
+        self.deadline = start + time_limit if time_limit is not None else None
+        best_move = valid_moves[0]
+        try:
+            for depth in range(start_depth, max_depth + 1):
+                move = self.best_move(depth)
+                if self.stopped:
+                    break
+                best_move = move
+                self.completed_depth = depth
+                self.depth_times[depth] = time.monotonic() - start
+                pv = self._walk_pv(depth)
+                self.pv = [move for _, _, move in pv]
+                self._pv_moves = {key: transform_move(move, sym) if sym else move for key, sym, move in pv}
+        finally:
+            self.deadline = None
+            self._pv_moves = {}
         return best_move
@@ -0,0 +1,206 @@
+import time
+from collections import namedtuple
+
+from bitboard import FULL, flip_mask, move_mask
+
+EndgameResult = namedtuple('EndgameResult', ['score', 'move', 'outcome'])
+
+# Quadrant masks used for parity ordering.
+QUADRANTS = [0x0F0F0F0F, 0xF0F0F0F0, 0x0F0F0F0F << 32, 0xF0F0F0F0 << 32]
+QUADRANT_OF = [(r >= 4) * 2 + (c >= 4) for r in range(8) for c in range(8)]
+
+# Below this many empties the moves are only ordered by parity, not by mobility.
+FASTEST_FIRST_EMPTIES = 7
+# At or below this many empties the solver walks the empty squares instead of
+# generating a move mask.
+SMALL_EMPTIES = 4
+
+
+def board_bits(game, player):
+    """
+    Return the (own, opponent) bitboards of any board backend for the given player.
+    """
+    if hasattr(game, 'discs'):
+        return game.discs[player], game.discs[-player]
+    own = opp = 0
+    for r in range(8):
+        for c in range(8):
+            value = game.square(r, c)
+            if value == player:
+                own |= 1 << (r * 8 + c)
+            elif value == -player:
+                opp |= 1 << (r * 8 + c)
+    return own, opp
+
+
+def final_score(own, opp):
+    """Disc difference at the end of the game, with the empty squares going to the winner."""
+    diff = own.bit_count() - opp.bit_count()
+    empties = 64 - (own | opp).bit_count()
+    if diff > 0:
+        return diff + empties
+    if diff < 0:
+        return diff - empties
+    return 0
+
+
+def outcome(score):
+    return 'win' if score > 0 else 'loss' if score < 0 else 'draw'
+
+
+class EndgameSolver:
+    """
+    Exact solver for the last empty squares of a game.
+
+    Scores are final disc differences from the perspective of the side to move.
+    Moves are ordered by quadrant parity (odd regions first) and, with enough
+    empties left, fastest-first (fewest opponent replies). The last few empties
+    are handled by dedicated code that walks the empty squares directly.
+    """
+
+    def __init__(self, check_interval=4096):
+        self.check_interval = check_interval
+        self.nodes = 0
+        self.deadline = None
+        self.stopped = False
+        self._next_check = check_interval
+
+    def solve(self, game, player, wld=False, deadline=None):
+        """
+        Solve the current position exactly.
+
+        Parameters:
+            game: The board to solve, either Othello or BitboardOthello.
+            player (int): The player to move.
+            wld (bool): Only prove win, loss or draw with a (-1, 1) window, which is much
+                cheaper; the score is then only correct in sign.
+            deadline (float): time.monotonic() value at which to give up, or None.
+
+        Returns:
+            EndgameResult: The score, the best move (None if the player must pass) and
+                'win', 'loss' or 'draw'; None if the deadline was reached.
+        """
+        own, opp = board_bits(game, player)
+        self.nodes = 0
+        self.deadline = deadline
+        self.stopped = False
+        self._next_check = self.check_interval
+        alpha, beta = (-1, 1) if wld else (-65, 65)
+
+        moves = move_mask(own, opp)
+        if not moves:
+            score = self._solve(own, opp, alpha, beta, False)
+            return None if self.stopped else EndgameResult(score, None, outcome(score))
+
+        best_score = -65
+        best_move = None
+        for bit, flips in self._ordered(own, opp, moves):
+            score = -self._solve(opp ^ flips, own | flips | bit, -beta, -alpha, False)
+            if self.stopped:
+                return None
+            if score > best_score:
+                best_score = score
+                best_move = divmod(bit.bit_length() - 1, 8)
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                break
+        return EndgameResult(best_score, best_move, outcome(best_score))
+
+    def _ordered(self, own, opp, moves):
+        """Return (bit, flips) pairs for the moves, best candidates first."""
+        empties = ~(own | opp) & FULL
+        odd = [(empties & q).bit_count() & 1 for q in QUADRANTS]
+        fastest_first = empties.bit_count() > FASTEST_FIRST_EMPTIES
+        scored = []
+        while moves:
+            bit = moves & -moves
+            moves ^= bit
+            flips = flip_mask(bit, own, opp)
+            # Odd regions first; within them, fewest opponent replies first
+            key = -odd[QUADRANT_OF[bit.bit_length() - 1]] * 64
+            if fastest_first:
+                key += move_mask(opp ^ flips, own | flips | bit).bit_count()
+            scored.append((key, bit, flips))
+        scored.sort(key=lambda item: item[0])
+        return [(bit, flips) for _, bit, flips in scored]
+
+    def _solve(self, own, opp, alpha, beta, passed):
+        self.nodes += 1
+        if self.nodes >= self._next_check:
+            self._next_check = self.nodes + self.check_interval
+            if self.deadline is not None and time.monotonic() >= self.deadline:
+                self.stopped = True
+        if self.stopped:
+            return 0
+
+        empties = ~(own | opp) & FULL
+        count = empties.bit_count()
+        if count == 1:
+            return self._solve_last(own, opp, empties)
+        if count <= SMALL_EMPTIES:
+            return self._solve_small(own, opp, alpha, beta, empties, False)
+
+        moves = move_mask(own, opp)
+        if not moves:
+            if passed or not move_mask(opp, own):
+                return final_score(own, opp)
+            return -self._solve(opp, own, -beta, -alpha, True)
+
+        best = -65
+        for bit, flips in self._ordered(own, opp, moves):
+            score = -self._solve(opp ^ flips, own | flips | bit, -beta, -alpha, False)
+            if score > best:
+                best = score
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+        return best
+
+    def _solve_small(self, own, opp, alpha, beta, empties, passed):
+        """Solve two to four empties by trying each empty square, odd quadrants first."""
+        squares = []
+        odd = [(empties & q).bit_count() & 1 for q in QUADRANTS]
+        rest = empties
+        while rest:
+            bit = rest & -rest
+            rest ^= bit
+            if odd[QUADRANT_OF[bit.bit_length() - 1]]:
+                squares.insert(0, bit)
+            else:
+                squares.append(bit)
+
+        best = -65
+        for bit in squares:
+            flips = flip_mask(bit, own, opp)
+            if not flips:
+                continue
+            self.nodes += 1
+            child_empties = empties ^ bit
+            new_own, new_opp = opp ^ flips, own | flips | bit
+            if child_empties & (child_empties - 1):
+                score = -self._solve_small(new_own, new_opp, -beta, -alpha, child_empties, False)
+            else:
+                score = -self._solve_last(new_own, new_opp, child_empties)
+            if score > best:
+                best = score
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        return best
+        if best > -65:
+            return best
+        # No move for the side to move
+        if passed:
+            return final_score(own, opp)
+        return -self._solve_small(opp, own, -beta, -alpha, empties, True)
+
+    def _solve_last(self, own, opp, bit):
+        """Score the position with a single empty square without any search."""
+        flips = flip_mask(bit, own, opp)
+        if flips:
+            return final_score(own | flips | bit, opp ^ flips)
+        flips = flip_mask(bit, opp, own)
+        if flips:
+            return final_score(own ^ flips, opp | flips | bit)
+        return final_score(own, opp)
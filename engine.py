@@ -0,0 +1,229 @@
+"""
+Batch move engine: answers many move requests together on a pool of worker processes.
+
+Measure throughput and latency on random positions with:
+    python engine.py --games 256 --budget 0.2 --workers 8
+"""
+import argparse
+import math
+import os
+import random
+import time
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from bitboard import BitboardOthello
+from book import OpeningBook, book_key
+from bot import OthelloAI
+from endgame import board_bits
+from symmetry import INVERSE, transform_move
+
+# source is 'book', 'cache', 'search', or 'pass' when the side to move has no valid move (move is None)
+MoveResult = namedtuple('MoveResult', 'move score source latency')
+
+_worker_ai = None
+
+
+def init_worker(options):
+    """Pool initializer: create the worker's OthelloAI, shared by every request it serves."""
+    global _worker_ai
+    _worker_ai = OthelloAI(BitboardOthello(), **options)
+
+
+def search_position(p1, p2, player, budget):
+    """
+    Search a position in a worker process set up by init_worker.
+
+    The worker's AI keeps its transposition table and move-ordering tables across
+    requests; only the board is replaced.
+
+    Parameters:
+        p1 (int): Bitboard of player 1.
+        p2 (int): Bitboard of player 2.
+        player (int): The player to move.
+        budget (float): Seconds available for the search.
+
+    Returns:
+        tuple: (best move, score).
+    """
+    _worker_ai.game = BitboardOthello.from_bits(p1, p2, player)
+    move = _worker_ai.search(time_limit=budget)
+    return move, _worker_ai.best_eval
+
+
+def _search_request(task):
+    """
+    Search one request of a batch.
+
+    Returns:
+        tuple: (task id, best move, score).
+    """
+    task_id, p1, p2, player, budget = task
+    return (task_id,) + search_position(p1, p2, player, budget)
+
+
+def percentile(values, fraction):
+    """The nearest-rank percentile of a list of numbers."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+class BatchEngine:
+    """
+    Plays the moves of many games at once.
+
+    The requests of a batch are answered from the opening book and from a cache of
+    earlier answers first; both are keyed by the canonical position key, so the 8
+    symmetric images of a position and duplicate requests share one answer. The
+    remaining positions are searched once each on a process pool, longest budget
+    first, by long-lived OthelloAI instances that keep their canonical
+    transposition tables between requests.
+    """
+
+    def __init__(self, workers=None, book=None, cache_size=100000, **options):
+        """
+        Parameters:
+            workers (int): Number of worker processes, os.cpu_count() by default.
+            book (str): Path of an opening book, or None.
+            cache_size (int): Maximum number of cached answers; the least recently used
+                answer is dropped first.
+            options: Further OthelloAI options used by the workers.
+        """
+        self.workers = workers or os.cpu_count()
+        self.book = OpeningBook(book) if book else None
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        options.setdefault('canonical', True)
+        self._pool = ProcessPoolExecutor(self.workers, initializer=init_worker, initargs=(options,))
+        self.stats = {}
+
+    def close(self):
+        self._pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _lookup(self, game, player, key, sym, budget):
+        """Answer a request from the book or the cache, or return None."""
+        if self.book is not None:
+            entry = self.book.lookup(game, player)
+            if entry is not None:
+                return entry[0], entry[1], 'book'
+        cached = self.cache.get(key)
+        if cached is not None and cached[2] >= budget:
+            self.cache.move_to_end(key)
+            return transform_move(cached[0], INVERSE[sym]), cached[1], 'cache'
+        return None
+
+    def play(self, requests):
+        """
+        Find the moves of a batch of positions.
+
+        Parameters:
+            requests (list): (position, player, budget) tuples, where position is an
+                Othello or BitboardOthello board and budget is the search time in seconds.
+
+        Returns:
+            list: One MoveResult per request, in request order.
+        """
+        start = time.monotonic()
+        results = [None] * len(requests)
+        # canonical key -> (budget, bitboards, side to move, [(request index, symmetry)])
+        pending = {}
+        counts = {'book': 0, 'cache': 0, 'search': 0, 'pass': 0}
+        for i, (game, player, budget) in enumerate(requests):
+            if not game.has_valid_move(player):
+                results[i] = MoveResult(None, None, 'pass', time.monotonic() - start)
+                counts['pass'] += 1
+                continue
+            key, sym = book_key(game, player)
+            answer = self._lookup(game, player, key, sym, budget)
+            if answer is not None:
+                results[i] = MoveResult(*answer, time.monotonic() - start)
+                counts[answer[2]] += 1
+            elif key in pending:
+                pending[key][3].append((i, sym))
+                pending[key][0] = max(pending[key][0], budget)
+            else:
+                pending[key] = [budget, board_bits(game, 1), player, [(i, sym)]]
+
+        # Longest jobs first keeps the workers busy until the end of the batch
+        keys = sorted(pending, key=lambda k: -pending[k][0])
+        futures = []
+        for task_id, key in enumerate(keys):
+            budget, (p1, p2), player, _ = pending[key]
+            futures.append(self._pool.submit(_search_request, (task_id, p1, p2, player, budget)))
+        for future in as_completed(futures):
+            task_id, move, score = future.result()
+            latency = time.monotonic() - start
+            key = keys[task_id]
+            budget, _, _, waiting = pending[key]
+            first_sym = waiting[0][1]
+            canonical_move = transform_move(move, first_sym)
+            for i, sym in waiting:
+                results[i] = MoveResult(transform_move(canonical_move, INVERSE[sym]), score, 'search', latency)
+            counts['search'] += len(waiting)
+            self.cache[key] = (canonical_move, score, budget)
+            self.cache.move_to_end(key)
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+
+        elapsed = time.monotonic() - start
+        # Passes are answered without any work and would only flatter the latencies
+        latencies = [result.latency for result in results if result.source != 'pass']
+        self.stats = {
+            'requests': len(requests),
+            'searched': len(keys),
+            'book_hits': counts['book'],
+            'cache_hits': counts['cache'],
+            'passes': counts['pass'],
+            'seconds': elapsed,
+            'moves_per_sec': len(requests) / elapsed if elapsed else float('inf'),
+            'p50_latency': percentile(latencies, 0.5) if latencies else 0.0,
+            'p99_latency': percentile(latencies, 0.99) if latencies else 0.0,
+        }
+        return results
+
+
+def random_positions(count, min_plies=8, max_plies=40, seed=0):
+    """Positions reached by random moves from the start, each with the player to move."""
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        game = BitboardOthello()
+        for _ in range(rng.randint(min_plies, max_plies)):
+            valid_moves = game.valid_moves(game.current_player)
+            if valid_moves:
+                move = rng.choice(valid_moves)
+                game.make_move(move[0], move[1], game.current_player)
+            game.switch_player()
+        if game.has_valid_move(game.current_player):
+            positions.append((game, game.current_player))
+    return positions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the throughput of the batch engine.")
+    parser.add_argument('--games', type=int, default=256)
+    parser.add_argument('--budget', type=float, default=0.2, help="search seconds per move")
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--book', help="opening book file")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    requests = [(game, player, args.budget) for game, player in random_positions(args.games, seed=args.seed)]
+    with BatchEngine(args.workers, args.book) as engine:
+        engine.play(requests[:args.workers])  # start the worker processes before timing
+        engine.cache.clear()
+        engine.play(requests)
+        stats = engine.stats
+    print(f"{stats['requests']} moves in {stats['seconds']:.2f}s: {stats['moves_per_sec']:.1f} moves/s, "
+          f"p50 {stats['p50_latency'] * 1000:.0f} ms, p99 {stats['p99_latency'] * 1000:.0f} ms "
+          f"({stats['searched']} searched, {stats['book_hits']} book, {stats['cache_hits']} cached)")
+
+
+if __name__ == '__main__':
+    main()
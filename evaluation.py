@@ -0,0 +1,95 @@
+from patterns import DIGIT, SQUARE_PATTERNS, pattern_indices
+
+CORNERS = (0, 7, 56, 63)
+EDGES = tuple(c for c in range(1, 7)) + tuple(56 + c for c in range(1, 7)) + \
+    tuple(r * 8 for r in range(1, 7)) + tuple(r * 8 + 7 for r in range(1, 7))
+
+IS_CORNER = [sq in CORNERS for sq in range(64)]
+IS_EDGE = [sq in EDGES for sq in range(64)]
+CORNER_MASK = sum(1 << sq for sq in CORNERS)
+EDGE_MASK = sum(1 << sq for sq in EDGES)
+
+
+def flipped_squares(flips):
+    """Square indices of the flipped pieces returned by either board backend."""
+    if isinstance(flips, int):
+        squares = []
+        while flips:
+            lsb = flips & -flips
+            squares.append(lsb.bit_length() - 1)
+            flips ^= lsb
+        return squares
+    return [r * 8 + c for r, c in flips]
+
+
+class EvalState:
+    """
+    Evaluation terms kept up to date by OthelloAI.apply_move and undo_move.
+
+    discs[player] is the disc count of each side, corners and edges are the sums of
+    the corner and edge squares (+1 for player 1, -1 for player 2), and patterns
+    holds the base-3 index of every pattern instance when track_patterns is set.
+    undo restores the previous terms from a stack, so it costs O(1).
+    """
+
+    def __init__(self, game, track_patterns=False):
+        self.track_patterns = track_patterns
+        self._stack = []
+        self.reset(game)
+
+    def reset(self, game):
+        """Recompute every term from the board."""
+        self.discs = [0, game.count(1), game.count(-1)]
+        self.corners = sum(game.square(sq // 8, sq % 8) for sq in CORNERS)
+        self.edges = sum(game.square(sq // 8, sq % 8) for sq in EDGES)
+        self.patterns = pattern_indices(game) if self.track_patterns else None
+        self._stack.clear()
+
+    def apply(self, move, player, flips):
+        """
+        Update the terms for a move.
+
+        Parameters:
+            move (tuple): The move that was played.
+            player (int): The player who made the move.
+            flips: The flipped pieces returned by the board's apply_move.
+        """
+        placed = move[0] * 8 + move[1]
+        discs = self.discs
+        self._stack.append((discs[1], discs[-1], self.corners, self.edges, self.patterns))
+
+        if IS_CORNER[placed]:
+            self.corners += player
+        elif IS_EDGE[placed]:
+            self.edges += player
+        # A flip turns -player into player, which changes the sums by 2 * player
+        if isinstance(flips, int) and not self.track_patterns:
+            # Bitboard flips are counted with masks, without visiting the squares
+            flipped = flips.bit_count()
+            self.corners += 2 * player * (flips & CORNER_MASK).bit_count()
+            self.edges += 2 * player * (flips & EDGE_MASK).bit_count()
+        else:
+            squares = flipped_squares(flips)
+            flipped = len(squares)
+            for sq in squares:
+                if IS_CORNER[sq]:
+                    self.corners += 2 * player
+                elif IS_EDGE[sq]:
+                    self.edges += 2 * player
+        discs[player] += flipped + 1
+        discs[-player] -= flipped
+
+        if self.track_patterns:
+            squares = flipped_squares(flips)
+            patterns = self.patterns[:]
+            for i, power in SQUARE_PATTERNS[placed]:
+                patterns[i] += power * DIGIT[player]
+            flip_delta = DIGIT[player] - DIGIT[-player]
+            for sq in squares:
+                for i, power in SQUARE_PATTERNS[sq]:
+                    patterns[i] += power * flip_delta
+            self.patterns = patterns
+
+    def undo(self):
+        """Revert the last applied move."""
+        self.discs[1], self.discs[-1], self.corners, self.edges, self.patterns = self._stack.pop()
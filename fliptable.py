@@ -0,0 +1,134 @@
+"""
+Flip table: the discs flipped on one 8-cell line for every line content and move position.
+
+A move flips discs along its row, column, diagonal and anti-diagonal only, and on
+each line the result depends on nothing but the 8 cells of the line. The table is
+indexed by (position << 16) | (own cells << 8) | opponent cells and holds the
+flipped cells as an 8-bit mask; table_flips gathers the 4 lines of a square from
+the bitboards, looks each one up and scatters the flips back.
+
+The table is generated once and cached in ~/.cache/othelo/flip_table.bin (or under
+$XDG_CACHE_HOME) with a CRC-32 of its contents in the header; it is regenerated if
+the cache is missing, stale or damaged, and kept in memory only if the cache can
+not be written.
+"""
+import os
+import struct
+import zlib
+
+FLIP_MAGIC = b'OTFT'
+FLIP_VERSION = 2
+# magic, version, reserved, CRC-32 of the table
+FLIP_HEADER = struct.Struct('<4sHHI')
+TABLE_SIZE = 8 << 16
+
+FILE_A = 0x0101010101010101
+# Multiplying the masked column by this collects row k of the column in bit k of the top byte
+COLUMN_MAGIC = 0x0102040810204080
+
+# COLUMN_BITS[m] puts bit k of the line mask m on row k of column 0
+COLUMN_BITS = [sum(1 << (k * 8) for k in range(8) if m >> k & 1) for m in range(256)]
+DIAGONALS = [sum(1 << (r * 8 + c) for r in range(8) for c in range(8) if r - c == sq // 8 - sq % 8)
+             for sq in range(64)]
+ANTI_DIAGONALS = [sum(1 << (r * 8 + c) for r in range(8) for c in range(8) if r + c == sq // 8 + sq % 8)
+                  for sq in range(64)]
+
+
+def line_flips(pos, own, opp):
+    """The cells flipped by a disc placed at pos on one line, walking both ways."""
+    flips = 0
+    for step in (1, -1):
+        i = pos + step
+        run = 0
+        while 0 <= i < 8 and opp >> i & 1:
+            run |= 1 << i
+            i += step
+        if 0 <= i < 8 and own >> i & 1:
+            flips |= run
+    return flips
+
+
+def generate_table():
+    """Compute the flips of every position and line content; impossible contents stay 0."""
+    table = bytearray(TABLE_SIZE)
+    for pos in range(8):
+        bit = 1 << pos
+        for own in range(256):
+            if own & bit:
+                continue
+            for opp in range(256):
+                if not opp & (own | bit):
+                    table[(pos << 16) | (own << 8) | opp] = line_flips(pos, own, opp)
+    return bytes(table)
+
+
+def cache_path():
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'othelo', 'flip_table.bin')
+
+
+def load_table(path=None):
+    """
+    Read the table from the cache, generating and caching it if necessary.
+
+    Returns:
+        bytes: The flip table.
+    """
+    path = path or cache_path()
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+        magic, version, _, checksum = FLIP_HEADER.unpack_from(data)
+        table = data[FLIP_HEADER.size:]
+        if (magic == FLIP_MAGIC and version == FLIP_VERSION and len(table) == TABLE_SIZE
+                and zlib.crc32(table) == checksum):
+            return table
+    except (OSError, struct.error):
+        pass
+    table = generate_table()
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary file first so that a concurrent reader never sees half a table
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(FLIP_HEADER.pack(FLIP_MAGIC, FLIP_VERSION, 0, zlib.crc32(table)))
+            f.write(table)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+    return table
+
+
+FLIPS = load_table()
+
+
+def table_flips(sq, own, opp):
+    """
+    Compute the discs flipped by placing a disc on a square with four table lookups.
+
+    Parameters:
+        sq (int): The square being played, row * 8 + col.
+        own (int): Bitboard of the side to move.
+        opp (int): Bitboard of the opponent.
+
+    Returns:
+        int: Bitboard of the flipped discs (0 if the move is illegal).
+    """
+    row = sq >> 3
+    col = sq & 7
+    shift = row * 8
+    flips = FLIPS[(col << 16) | (((own >> shift) & 0xFF) << 8) | ((opp >> shift) & 0xFF)] << shift
+    line = FLIPS[(row << 16) | ((((own >> col) & FILE_A) * COLUMN_MAGIC >> 56 & 0xFF) << 8)
+                 | (((opp >> col) & FILE_A) * COLUMN_MAGIC >> 56 & 0xFF)]
+    if line:
+        flips |= COLUMN_BITS[line] << col
+    # A diagonal has one cell per column, so summing its rows packs it into a byte by column
+    mask = DIAGONALS[sq]
+    line = FLIPS[(col << 16) | (((own & mask) * FILE_A >> 56 & 0xFF) << 8) | ((opp & mask) * FILE_A >> 56 & 0xFF)]
+    if line:
+        flips |= (line * FILE_A) & mask
+    mask = ANTI_DIAGONALS[sq]
+    line = FLIPS[(col << 16) | (((own & mask) * FILE_A >> 56 & 0xFF) << 8) | ((opp & mask) * FILE_A >> 56 & 0xFF)]
+    if line:
+        flips |= (line * FILE_A) & mask
+    return flips
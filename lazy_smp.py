@@ -0,0 +1,134 @@
+"""
+Lazy SMP: several processes search the same position and share one transposition table.
+
+Compare with a single process with:
+    python lazy_smp.py --time 5 --workers 8
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from bitboard import BitboardOthello
+from bot import OthelloAI
+from endgame import board_bits
+from ordering import MoveOrderer
+from transposition import SharedTranspositionTable
+
+# Workers start at depths 1 to DEPTH_OFFSETS, one iteration apart
+DEPTH_OFFSETS = 3
+
+
+def _lazy_worker(task):
+    """
+    Run iterative deepening in one worker on the shared table.
+
+    Returns:
+        tuple: (completed depth, best move, value, nodes searched).
+    """
+    p1, p2, player, tt, worker_id, time_limit, max_depth, options = task
+    game = BitboardOthello.from_bits(p1, p2, player)
+    if worker_id and 'orderer' not in options:
+        # Helpers order moves with their own random tie-breaks so that they search
+        # different subtrees first; worker 0 keeps the plain ordering
+        options = dict(options, orderer=MoveOrderer(seed=worker_id))
+    ai = OthelloAI(game, tt=tt, **options)
+    # Stagger the iterations so that the helpers fill the table ahead of each other
+    move = ai.search(time_limit=time_limit, max_depth=max_depth, start_depth=1 + worker_id % DEPTH_OFFSETS)
+    tt.close()
+    return ai.completed_depth, move, ai.best_eval, ai.nodes
+
+
+class LazySMPSearch:
+    """
+    Multi-process search in the Lazy SMP style.
+
+    Every worker runs OthelloAI.search on the same position with a shared,
+    lock-free SharedTranspositionTable. The workers start at staggered depths and
+    the helpers (every worker but 0) break move-ordering ties with their own seed,
+    so they search different parts of the tree and keep finding each other's
+    results in the table. The move of the deepest completed iteration is played,
+    the lowest worker id breaking ties.
+    """
+
+    def __init__(self, game, workers=None, tt_size_mb=64, **options):
+        """
+        Parameters:
+            game: The board to search, either Othello or BitboardOthello.
+            workers (int): Number of worker processes, os.cpu_count() by default.
+            tt_size_mb (float): Size of the shared transposition table in megabytes.
+            options: Further OthelloAI options used by the workers.
+        """
+        self.game = game
+        self.workers = workers or os.cpu_count()
+        self.options = options
+        self.tt = SharedTranspositionTable(tt_size_mb)
+        self._pool = ProcessPoolExecutor(self.workers)
+        self.best_eval = None
+        self.completed_depth = 0
+        self.nodes = 0
+
+    def close(self):
+        self._pool.shutdown()
+        self.tt.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def search(self, time_limit=None, max_depth=None):
+        """
+        Search the current position with all workers.
+
+        Parameters:
+            time_limit (float): Seconds available for the move, or None for no limit.
+            max_depth (int): The deepest iteration to run, or None.
+
+        Returns:
+            tuple: The best move, or None if the player to move has no valid move.
+        """
+        player = self.game.current_player
+        if not self.game.has_valid_move(player):
+            return None
+        p1, p2 = board_bits(self.game, 1)
+        self.tt.new_search()
+        tasks = [(p1, p2, player, self.tt, i, time_limit, max_depth, self.options) for i in range(self.workers)]
+        results = list(self._pool.map(_lazy_worker, tasks))
+
+        best = max(range(len(results)), key=lambda i: (results[i][0], -i))
+        self.completed_depth, move, self.best_eval, _ = results[best]
+        self.nodes = sum(result[3] for result in results)
+        return move
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare Lazy SMP against a single search process.")
+    parser.add_argument('--time', type=float, default=5.0, help="seconds per search")
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--plies', type=int, default=10, help="moves played before the measured position")
+    args = parser.parse_args()
+
+    game = BitboardOthello()
+    ai = OthelloAI(game)
+    for _ in range(args.plies):
+        move = ai.best_move(2)
+        if move is None:
+            break
+        game.make_move(move[0], move[1], game.current_player)
+        game.switch_player()
+
+    single = OthelloAI(game)
+    start = time.monotonic()
+    single.search(time_limit=args.time)
+    print(f"1 process: depth {single.completed_depth}, {single.nodes} nodes in {time.monotonic() - start:.2f}s")
+    with LazySMPSearch(game, args.workers) as smp:
+        start = time.monotonic()
+        smp.search(time_limit=args.time)
+        print(f"{args.workers} processes: depth {smp.completed_depth}, {smp.nodes} nodes "
+              f"in {time.monotonic() - start:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,26 +1,35 @@
 from othelo import Othello
+from bitboard import BitboardOthello
+from book import OpeningBook
 from bot import OthelloAI
-import time
+from mcts import OthelloMCTS
+from patterns import PatternEvaluator
+from ponder import Ponderer
+import sys
 
-def play_othello():
-    game = Othello()
-    ai = OthelloAI(game)
+def play_othello(board_class=Othello, weights=None, book=None, mcts=False, ponder=False):
+    game = board_class()
+    if mcts:
+        # The same engine plays every move, so it keeps the subtree of the position reached
+        ai = OthelloMCTS(game)
+    else:
+        ai = OthelloAI(game, evaluator=PatternEvaluator(weights) if weights else None,
+                       book=OpeningBook(book) if book else None)
+    # Search the human's position in the background while waiting for their move
+    ponderer = Ponderer(ai) if ponder and not mcts else None
     
     # Implementing an iterative deepening approach combined with a time-bound search strategy for the AI's decision-making process.
 
     # Summary:
     # Othello is a complex game with an enormous number of possible board states, making it impractical to explore the entire game tree, even with alpha-beta pruning.
-    # To ensure that the AI can make decisions within a reasonable time frame, we use iterative deepening.
+    # To ensure that the AI can make decisions within a reasonable time frame, OthelloAI.search uses iterative deepening.
     # This technique starts the search at a shallow depth and incrementally deepens the search level until a preset time limit is reached.
-    # The AI begins with a depth of 1 and continues deepening the search until the time limit (e.g., 4 seconds) is exceeded.
+    # The deadline is also checked inside the search, so a deep iteration is aborted as soon as the time limit (e.g., 4 seconds) is exceeded.
+    # The AI then plays the best move of the last depth it completed, feeding each depth's principal variation into the next one.
     # By doing so, we strike a balance between making well-informed moves and maintaining a responsive gameplay experience.
-    # The AI selects the best move found within the time limit, ensuring that the game remains playable and challenging without excessive delays.
 
     # Set the time limit for AI to make a move
     time_limit = 4.0  # seconds
-    
-    # Starting depth for iterative deepening
-    initial_depth = 1 
 
     while True:
         game.print_board()
@@ -28,7 +37,13 @@ def play_othello():
             if game.current_player == 1:  # Human player
                 print("Moves: ", game.valid_moves(game.current_player))
                
-                row, col = map(int, input("Enter your move (row col): ").split())
+                if ponderer:
+                    ponderer.start()
+                try:
+                    row, col = map(int, input("Enter your move (row col): ").split())
+                finally:
+                    if ponderer:
+                        ponderer.stop()
                 if (row, col) in game.valid_moves(game.current_player):
                     game.make_move(row, col, game.current_player)
                 else:
@@ -36,17 +51,7 @@ def play_othello():
                     continue
             else:  # AI player
                 print("AI is making a move...")
-                start_time = time.time()
-                best_move = None
-
-                for depth in range(initial_depth, 100):  # Arbitrary large upper limit
-                    elapsed_time = time.time() - start_time
-                    if elapsed_time > time_limit:
-                        break  # Stop deepening if time exceeds the limit
-
-                    move = ai.best_move(depth=depth)
-                    if move:
-                        best_move = move
+                best_move = ai.search(time_limit=time_limit)
 
                 if best_move:
                     game.make_move(best_move[0], best_move[1], game.current_player)
@@ -63,7 +68,7 @@ def play_othello():
             break
 
     game.print_board()
-    score = sum(sum(row) for row in game.board)
+    score = game.count(1) - game.count(-1)
     if score > 0:
         print("Player 1 (X) wins!")
     elif score < 0:
@@ -72,4 +77,8 @@ def play_othello():
         print("It's a draw!")
 
 if __name__ == "__main__":
-    play_othello()
+    args = sys.argv[1:]
+    weights = args[args.index("--weights") + 1] if "--weights" in args else None
+    book = args[args.index("--book") + 1] if "--book" in args else None
+    play_othello(BitboardOthello if "--bitboard" in args else Othello, weights, book, "--mcts" in args,
+                 "--ponder" in args)
@@ -0,0 +1,291 @@
+import math
+import random
+import time
+from array import array
+
+from bitboard import flip_mask, move_mask
+from endgame import board_bits
+
+try:
+    import numpy as np
+    from playouts import batch_playouts
+except ImportError:  # batched leaf playouts are optional
+    np = None
+
+UNEXPANDED = -1
+TERMINAL = -2
+PASS = -1
+
+
+class OthelloMCTS:
+    """
+    Monte Carlo Tree Search (UCT) engine with the same best_move/search interface as OthelloAI.
+
+    The tree lives in parallel arrays indexed by node: visit counts, reward sums,
+    the offset of the first child (children of a node are contiguous), the number
+    of children and the move leading to the node. Positions are not stored; they
+    are replayed on bitboards while descending, and the descent keeps its path for
+    the backpropagation, so nodes need no parent links. Rewards are from the
+    point of view of the player who made the move leading to the node.
+    """
+
+    def __init__(self, game, playouts=2000, exploration=1.4, reuse_tree=True, max_nodes=1000000, seed=None,
+                 leaf_playouts=1):
+        """
+        Parameters:
+            game: The board to play on, either Othello or BitboardOthello.
+            playouts (int): Number of tree descents per best_move call.
+            exploration (float): The UCT exploration constant.
+            reuse_tree (bool): Keep the subtree of the position reached after the moves
+                played since the previous call.
+            max_nodes (int): Stop growing the tree beyond this many nodes.
+            seed (int): Seed of the random playouts.
+            leaf_playouts (int): Random games played from every leaf. Above 1 they are
+                played in one batch by playouts.batch_playouts, which needs NumPy.
+        """
+        self.game = game
+        self.playouts = playouts
+        self.exploration = exploration
+        self.reuse_tree = reuse_tree
+        self.max_nodes = max_nodes
+        self.rng = random.Random(seed)
+        self.leaf_playouts = leaf_playouts
+        if leaf_playouts > 1:
+            if np is None:
+                raise ImportError("leaf_playouts > 1 needs NumPy")
+            self._np_rng = np.random.default_rng(seed)
+        self.playouts_done = 0
+        self.reused_nodes = 0
+        self._root_position = None
+        self._new_tree()
+
+    def _new_tree(self):
+        self.visits = array('I')
+        self.rewards = array('d')
+        self.first_child = array('i')
+        self.child_count = array('B')
+        self.moves = array('b')
+        self._add_node(PASS)
+
+    def _add_node(self, square):
+        self.visits.append(0)
+        self.rewards.append(0.0)
+        self.first_child.append(UNEXPANDED)
+        self.child_count.append(0)
+        self.moves.append(square)
+
+    def __len__(self):
+        return len(self.visits)
+
+    def _set_root(self):
+        """Point the root at the current position, reusing the matching subtree if possible."""
+        p1, p2 = board_bits(self.game, 1)
+        player = self.game.current_player
+        position = (p1, p2, player)
+        if position == self._root_position:
+            return
+        node = self._find_descendant(position) if self.reuse_tree and self._root_position else None
+        if node is None:
+            self._new_tree()
+            self.reused_nodes = 0
+        else:
+            self._extract_subtree(node)
+            self.reused_nodes = len(self)
+        self._root_position = position
+
+    def _find_descendant(self, position, max_plies=2):
+        """Find the node of a position reached from the root within max_plies moves."""
+        p1, p2, player = self._root_position
+        frontier = [(0, p1, p2, player)]
+        for _ in range(max_plies):
+            next_frontier = []
+            for node, b1, b2, mover in frontier:
+                first = self.first_child[node]
+                if first < 0:
+                    continue
+                for child in range(first, first + self.child_count[node]):
+                    c1, c2 = b1, b2
+                    square = self.moves[child]
+                    if square >= 0:
+                        bit = 1 << square
+                        if mover == 1:
+                            flips = flip_mask(bit, c1, c2)
+                            c1, c2 = c1 | flips | bit, c2 ^ flips
+                        else:
+                            flips = flip_mask(bit, c2, c1)
+                            c1, c2 = c1 ^ flips, c2 | flips | bit
+                    if (c1, c2, -mover) == position:
+                        return child
+                    next_frontier.append((child, c1, c2, -mover))
+            frontier = next_frontier
+        return None
+
+    def _extract_subtree(self, node):
+        """Make a node the new root, copying its subtree into fresh, compact arrays."""
+        old = (self.visits, self.rewards, self.first_child, self.child_count, self.moves)
+        old_visits, old_rewards, old_first, old_count, old_moves = old
+        self._new_tree()
+        self.visits[0] = old_visits[node]
+        self.rewards[0] = old_rewards[node]
+        queue = [(node, 0)]
+        while queue:
+            old_node, new_node = queue.pop()
+            first = old_first[old_node]
+            if first < 0:
+                self.first_child[new_node] = first
+                continue
+            count = old_count[old_node]
+            new_first = len(self.visits)
+            for child in range(first, first + count):
+                self._add_node(old_moves[child])
+                self.visits[-1] = old_visits[child]
+                self.rewards[-1] = old_rewards[child]
+                queue.append((child, len(self.visits) - 1))
+            self.first_child[new_node] = new_first
+            self.child_count[new_node] = count
+
+    def _expand(self, node, own, opp):
+        moves = move_mask(own, opp)
+        if not moves and not move_mask(opp, own):
+            self.first_child[node] = TERMINAL
+            return
+        self.first_child[node] = len(self.visits)
+        if not moves:
+            self.child_count[node] = 1
+            self._add_node(PASS)
+            return
+        self.child_count[node] = moves.bit_count()
+        while moves:
+            bit = moves & -moves
+            moves ^= bit
+            self._add_node(bit.bit_length() - 1)
+
+    def _select(self, node):
+        """Pick the child with the highest UCT score; unvisited children come first."""
+        first = self.first_child[node]
+        visits = self.visits
+        rewards = self.rewards
+        scale = self.exploration * math.sqrt(math.log(visits[node]))
+        best_child, best_score = first, float('-inf')
+        for child in range(first, first + self.child_count[node]):
+            n = visits[child]
+            if n == 0:
+                return child
+            score = rewards[child] / n + scale / math.sqrt(n)
+            if score > best_score:
+                best_child, best_score = child, score
+        return best_child
+
+    def _rollout(self, own, opp):
+        """
+        Play random moves until the end of the game.
+
+        Returns:
+            int: The final disc difference for the side to move at the start.
+        """
+        rng = self.rng
+        sign = 1
+        passed = False
+        while True:
+            moves = move_mask(own, opp)
+            if moves:
+                for _ in range(rng.randrange(moves.bit_count())):
+                    moves &= moves - 1
+                bit = moves & -moves
+                flips = flip_mask(bit, own, opp)
+                own, opp = opp ^ flips, own | flips | bit
+                passed = False
+            elif passed:
+                break
+            else:
+                own, opp = opp, own
+                passed = True
+            sign = -sign
+        return (own.bit_count() - opp.bit_count()) * sign
+
+    def _playout(self, own, opp):
+        node = 0
+        path = [0]
+        while self.first_child[node] >= 0:
+            node = self._select(node)
+            square = self.moves[node]
+            if square >= 0:
+                bit = 1 << square
+                flips = flip_mask(bit, own, opp)
+                own, opp = opp ^ flips, own | flips | bit
+            else:
+                own, opp = opp, own
+            path.append(node)
+
+        if self.first_child[node] == UNEXPANDED and len(self.visits) < self.max_nodes:
+            self._expand(node, own, opp)
+            if self.first_child[node] >= 0:
+                node = self.first_child[node] + self.rng.randrange(self.child_count[node])
+                square = self.moves[node]
+                if square >= 0:
+                    bit = 1 << square
+                    flips = flip_mask(bit, own, opp)
+                    own, opp = opp ^ flips, own | flips | bit
+                else:
+                    own, opp = opp, own
+                path.append(node)
+
+        # The result for the side to move at the leaf is a loss for the player who moved into it
+        n = self.leaf_playouts
+        if n > 1:
+            diffs = batch_playouts(np.full(n, own, dtype=np.uint64), np.full(n, opp, dtype=np.uint64), self._np_rng)
+            reward = float((diffs < 0).sum() + 0.5 * (diffs == 0).sum())
+        else:
+            diff = self._rollout(own, opp)
+            reward = 1.0 if diff < 0 else 0.0 if diff > 0 else 0.5
+        for node in reversed(path):
+            self.visits[node] += n
+            self.rewards[node] += reward
+            reward = n - reward
+
+    def _run(self, playouts, deadline=None):
+        self._set_root()
+        own, opp = board_bits(self.game, self.game.current_player)
+        done = 0
+        while done < playouts:
+            self._playout(own, opp)
+            done += 1
+            if deadline is not None and done % 16 == 0 and time.monotonic() >= deadline:
+                break
+        self.playouts_done = done
+        return self._most_visited()
+
+    def _most_visited(self):
+        first = self.first_child[0]
+        if first < 0:
+            return None
+        best = max(range(first, first + self.child_count[0]), key=lambda child: self.visits[child])
+        square = self.moves[best]
+        return divmod(square, 8) if square >= 0 else None
+
+    def best_move(self, depth=None):
+        """
+        Determine the best move with the configured number of playouts.
+
+        Parameters:
+            depth (int): Accepted for compatibility with OthelloAI.best_move and ignored.
+
+        Returns:
+            tuple: The most visited move, or None if the player to move has no valid move.
+        """
+        return self._run(self.playouts)
+
+    def search(self, time_limit=None, max_depth=None):
+        """
+        Run playouts until the time limit, or the configured number without one.
+
+        Parameters:
+            time_limit (float): Seconds available for the move, or None.
+            max_depth (int): Accepted for compatibility with OthelloAI.search and ignored.
+
+        Returns:
+            tuple: The most visited move, or None if the player to move has no valid move.
+        """
+        if time_limit is None:
+            return self._run(self.playouts)
+        return self._run(float('inf'), time.monotonic() + time_limit)
@@ -0,0 +1,115 @@
+import random
+
+MAX_PLY = 64
+
+HASH_MOVE_SCORE = 1 << 30
+KILLER_SCORE = 1 << 29
+
+# Static square priorities: corners first, then edges and the centre,
+# with the X-squares and C-squares next to empty corners last.
+SQUARE_PRIORITY = [
+    120, -20, 20, 5, 5, 20, -20, 120,
+    -20, -40, -5, -5, -5, -5, -40, -20,
+    20, -5, 15, 3, 3, 15, -5, 20,
+    5, -5, 3, 3, 3, 3, -5, 5,
+    5, -5, 3, 3, 3, 3, -5, 5,
+    20, -5, 15, 3, 3, 15, -5, 20,
+    -20, -40, -5, -5, -5, -5, -40, -20,
+    120, -20, 20, 5, 5, 20, -20, 120,
+]
+
+
+class MoveOrderer:
+    """
+    Orders the moves of a node so that alpha-beta sees the likely best move first.
+
+    The sources, from strongest to weakest, are the hash move (transposition table
+    or principal variation), two killer moves per ply, the history table indexed
+    by side and square, and the static square priorities. Each source can be
+    switched off, and OthelloAI accepts any object with the same order/update/
+    new_search methods.
+
+    A seed adds a fixed random offset below jitter to the score of every square,
+    so that orderers with different seeds break near-ties differently; Lazy SMP
+    uses this to send its helper workers down different parts of the tree.
+    """
+
+    def __init__(self, hash_move=True, killers=True, history=True, static=True, seed=None, jitter=12):
+        self.use_hash_move = hash_move
+        self.use_killers = killers
+        self.use_history = history
+        self.use_static = static
+        self.jitter = None
+        if seed is not None:
+            rng = random.Random(seed)
+            self.jitter = [rng.randrange(jitter) for _ in range(64)]
+        self.killers = [[None, None] for _ in range(MAX_PLY)]
+        # Indexed by player like the bitboard discs: history[1] and history[-1].
+        self.history = [None, [0] * 64, [0] * 64]
+
+    def new_search(self):
+        """Forget the killers and age the history before searching a new position."""
+        self.killers = [[None, None] for _ in range(MAX_PLY)]
+        for table in (self.history[1], self.history[-1]):
+            for sq in range(64):
+                table[sq] >>= 1
+
+    def order(self, moves, player, ply, hash_move=None):
+        """
+        Sort the moves in place, best candidates first.
+
+        Parameters:
+            moves (list): The valid moves of the node.
+            player (int): The player to move.
+            ply (int): Distance of the node from the root.
+            hash_move (tuple): The best move stored for this position, if any.
+
+        Returns:
+            list: The same list, sorted.
+        """
+        if len(moves) < 2:
+            return moves
+        if not self.use_hash_move:
+            hash_move = None
+        killers = self.killers[ply] if self.use_killers and ply < MAX_PLY else (None, None)
+        history = self.history[player] if self.use_history else None
+        static = SQUARE_PRIORITY if self.use_static else None
+        jitter = self.jitter
+
+        def score(move):
+            if move == hash_move:
+                return HASH_MOVE_SCORE
+            if move == killers[0]:
+                return KILLER_SCORE
+            if move == killers[1]:
+                return KILLER_SCORE - 1
+            sq = move[0] * 8 + move[1]
+            value = 0
+            if history is not None:
+                value += history[sq]
+            if static is not None:
+                value += static[sq]
+            if jitter is not None:
+                value += jitter[sq]
+            return value
+
+        moves.sort(key=score, reverse=True)
+        return moves
+
+    def update(self, move, player, ply, depth):
+        """
+        Record a move that caused a beta cut-off.
+
+        Parameters:
+            move (tuple): The move that caused the cut-off.
+            player (int): The player who made the move.
+            ply (int): Distance of the node from the root.
+            depth (int): Remaining depth of the node.
+        """
+        if self.use_killers and ply < MAX_PLY:
+            killers = self.killers[ply]
+            if killers[0] != move:
+                killers[1] = killers[0]
+                killers[0] = move
+        if self.use_history:
+            self.history[player][move[0] * 8 + move[1]] += depth * depth
@@ -1,54 +1,150 @@
+DIRECTIONS = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+
+# (row, col) of every flat square index
+SQUARES = [divmod(sq, 8) for sq in range(64)]
+
+
+def _ray(sq, dr, dc):
+    r, c = divmod(sq, 8)
+    ray = []
+    r, c = r + dr, c + dc
+    while 0 <= r < 8 and 0 <= c < 8:
+        ray.append(r * 8 + c)
+        r, c = r + dr, c + dc
+    return tuple(ray)
+
+
+# NEIGHBOURS[sq] is the bitmask of the squares adjacent to sq
+NEIGHBOURS = [sum(1 << (r * 8 + c) for r, c in ((sr + dr, sc + dc) for dr, dc in DIRECTIONS)
+                  if 0 <= r < 8 and 0 <= c < 8) for sr, sc in SQUARES]
+
+# RAYS[sq] holds the flat indices along each direction from sq, nearest first.
+# Rays shorter than two squares can never flip anything and are left out.
+RAYS = [tuple(ray for ray in (_ray(sq, dr, dc) for dr, dc in DIRECTIONS) if len(ray) >= 2) for sq in range(64)]
+
+
 class Othello:
     def __init__(self):
-        self.board = [[0] * 8 for _ in range(8)]  # 0: empty, 1: player 1, -1: player 2
-        self.board[3][3] = self.board[4][4] = 1
-        self.board[3][4] = self.board[4][3] = -1
+        # Flat board indexed by row * 8 + col; 0: empty, 1: player 1, -1: player 2
+        self.board = [0] * 64
+        self.board[27] = self.board[36] = 1
+        self.board[28] = self.board[35] = -1
         self.current_player = 1
+        self.reset_frontier()
+
+    def reset_frontier(self):
+        """
+        Recompute the frontier from the board, e.g. after the board was edited directly.
+
+        The frontier is the bitmask of the empty squares next to a disc; only those
+        can be valid moves. apply_move and undo_move keep it up to date, with a stack
+        of the earlier values so that undo_move restores it exactly.
+        """
+        self.occupied = sum(1 << sq for sq in range(64) if self.board[sq])
+        self.frontier = 0
+        for sq in range(64):
+            if self.board[sq]:
+                self.frontier |= NEIGHBOURS[sq]
+        self.frontier &= ~self.occupied
+        self._frontier_stack = []
 
     def print_board(self):
-        for row in self.board:
-            print(' '.join(['.' if x == 0 else 'X' if x == 1 else 'O' for x in row]))
+        for r in range(8):
+            print(' '.join(['.' if x == 0 else 'X' if x == 1 else 'O' for x in self.board[r * 8:r * 8 + 8]]))
         print()
 
+    def _move_squares(self, player):
+        """Yield the flat index of every valid move, stopping at the first direction that flips."""
+        board = self.board
+        opponent = -player
+        frontier = self.frontier
+        while frontier:
+            bit = frontier & -frontier
+            frontier ^= bit
+            sq = bit.bit_length() - 1
+            for ray in RAYS[sq]:
+                if board[ray[0]] != opponent:
+                    continue
+                for i in ray:
+                    value = board[i]
+                    if value != opponent:
+                        break
+                if value == player:
+                    yield sq
+                    break
+
     def valid_moves(self, player):
-        directions = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
-        moves = []
-        for r in range(8):
-            for c in range(8):
-                if self.board[r][c] == 0:
-                    for dr, dc in directions:
-                        nr, nc = r + dr, c + dc
-                        if 0 <= nr < 8 and 0 <= nc < 8 and self.board[nr][nc] == -player:
-                            while 0 <= nr < 8 and 0 <= nc < 8:
-                                if self.board[nr][nc] == 0:
-                                    break
-                                if self.board[nr][nc] == player:
-                                    moves.append((r, c))
-                                    break
-                                nr += dr
-                                nc += dc
-        return list(set(moves))
+        return [SQUARES[sq] for sq in self._move_squares(player)]
+
+    def mobility(self, player):
+        return sum(1 for _ in self._move_squares(player))
 
     def make_move(self, row, col, player):
-        self.board[row][col] = player
-        directions = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
-        for dr, dc in directions:
-            nr, nc = row + dr, col + dc
-            if 0 <= nr < 8 and 0 <= nc < 8 and self.board[nr][nc] == -player:
-                flip_positions = []
-                while 0 <= nr < 8 and 0 <= nc < 8:
-                    if self.board[nr][nc] == 0:
-                        break
-                    if self.board[nr][nc] == player:
-                        for fr, fc in flip_positions:
-                            self.board[fr][fc] = player
-                        break
-                    flip_positions.append((nr, nc))
-                    nr += dr
-                    nc += dc
+        self.apply_move((row, col), player)
+
+    def apply_move(self, move, player):
+        """
+        Apply the move to the board and return the positions of the pieces that were flipped.
+
+        Parameters:
+            move (tuple): The move to apply.
+            player (int): The player making the move.
+
+        Returns:
+            list: The positions of the pieces that were flipped.
+        """
+        row, col = move
+        sq = row * 8 + col
+        board = self.board
+        opponent = -player
+        flip_positions = []
+        board[sq] = player
+        self._frontier_stack.append(self.frontier)
+        self.occupied |= 1 << sq
+        self.frontier = (self.frontier | NEIGHBOURS[sq]) & ~self.occupied
+        for ray in RAYS[sq]:
+            if board[ray[0]] != opponent:
+                continue
+            for n, i in enumerate(ray):
+                value = board[i]
+                if value != opponent:
+                    break
+            if value == player:
+                for i in ray[:n]:
+                    board[i] = player
+                    flip_positions.append(SQUARES[i])
+        return flip_positions
+
+    def undo_move(self, move, player, flip_positions):
+        """
+        Undo the move and revert the positions of the flipped pieces.
+
+        Parameters:
+            move (tuple): The move to undo.
+            player (int): The player who made the move.
+            flip_positions (list): The positions returned by apply_move.
+
+        Moves must be undone in the reverse order of apply_move.
+        """
+        row, col = move
+        board = self.board
+        board[row * 8 + col] = 0
+        self.occupied ^= 1 << (row * 8 + col)
+        self.frontier = self._frontier_stack.pop()
+        for fr, fc in flip_positions:
+            board[fr * 8 + fc] = -player
+
+    def square(self, row, col):
+        return self.board[row * 8 + col]
+
+    def count(self, player):
+        return self.board.count(player)
+
+    def empty_count(self):
+        return 64 - self.occupied.bit_count()
 
     def has_valid_move(self, player):
-        return len(self.valid_moves(player)) > 0
+        return next(self._move_squares(player), None) is not None
 
     def switch_player(self):
         self.current_player *= -1
@@ -0,0 +1,171 @@
+"""
+Parallel root-splitting search across a process pool.
+
+Measure the speedup over the sequential search with:
+    python parallel.py --depth 6 --workers 8
+"""
+import argparse
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from bitboard import BitboardOthello
+from bot import NULL_WINDOW, OthelloAI
+from endgame import board_bits
+
+_shared_alpha = None
+
+
+def _init_worker(shared_alpha):
+    global _shared_alpha
+    _shared_alpha = shared_alpha
+
+
+def _search_root_move(task):
+    """
+    Search one root move in a worker process.
+
+    The window starts just below the best value found so far by any worker, so a
+    move that ties with it is still searched exactly. The shared value is read
+    only once, when the task starts; a better bound found by another worker while
+    this move is being searched does not narrow its window.
+
+    Returns:
+        tuple: (value, exact) where exact is False if the move failed low.
+    """
+    p1, p2, player, move, depth, options = task
+    game = BitboardOthello.from_bits(p1, p2, player)
+    ai = OthelloAI(game, **options)
+    ai.sync()
+    alpha = _shared_alpha.value - NULL_WINDOW
+    flip_positions = ai.apply_move(move, player)
+    value = -ai.pvs(depth - 1, -player, float('-inf'), -alpha)
+    ai.undo_move(move, player, flip_positions)
+    exact = value > alpha
+    if exact:
+        with _shared_alpha.get_lock():
+            if value > _shared_alpha.value:
+                _shared_alpha.value = value
+    return value, exact
+
+
+class ParallelSearch:
+    """
+    Searches the root moves of a position in parallel worker processes.
+
+    The first move (the best one of a shallow search) is searched alone to set a
+    bound; the others are then spread over the pool, and every worker starts its
+    move from the best value found so far, which the workers share through a
+    multiprocessing.Value. A worker reads that bound only when it starts a move,
+    not during the move's search. The result is merged deterministically: the highest
+    exact value wins and ties go to the move that comes first in the root order.
+    """
+
+    def __init__(self, game, workers=None, tt_size_mb=4, **options):
+        """
+        Parameters:
+            game: The board to search, either Othello or BitboardOthello.
+            workers (int): Number of worker processes, os.cpu_count() by default.
+            tt_size_mb (float): Size of the transposition table of each root move search.
+            options: Further OthelloAI options used by the workers.
+        """
+        self.game = game
+        self.workers = workers or os.cpu_count()
+        self.options = dict(options, tt_size_mb=tt_size_mb)
+        self._alpha = multiprocessing.Value('d', float('-inf'))
+        self._pool = ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(self._alpha,))
+        self._orderer = OthelloAI(game, tt_size_mb=1)
+        self.best_eval = None
+
+    def close(self):
+        self._pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def best_move(self, depth):
+        """
+        Determine the best move by searching the root moves in parallel.
+
+        Parameters:
+            depth (int): The maximum depth of the search tree.
+
+        Returns:
+            tuple: The best move, or None if the player to move has no valid move.
+        """
+        player = self.game.current_player
+        valid_moves = self.game.valid_moves(player)
+        if not valid_moves:
+            return None
+        first = self._orderer.best_move(max(1, depth - 2)) if depth > 1 else valid_moves[0]
+        moves = [first] + [m for m in self._orderer.orderer.order(valid_moves, player, 0) if m != first]
+
+        p1, p2 = board_bits(self.game, 1)
+        tasks = [(p1, p2, player, move, depth, self.options) for move in moves]
+        self._alpha.value = float('-inf')
+        results = [self._pool.submit(_search_root_move, tasks[0]).result()]
+        results += list(self._pool.map(_search_root_move, tasks[1:]))
+
+        best_move, best_eval = None, float('-inf')
+        for move, (value, exact) in zip(moves, results):
+            if exact and value > best_eval:
+                best_move, best_eval = move, value
+        self.best_eval = best_eval
+        return best_move
+
+
+def measure_speedup(game, depth, workers, **options):
+    """
+    Time the sequential search against the parallel search at a fixed depth.
+
+    Returns:
+        dict: The times of both searches, the speedup and whether they chose the same move.
+    """
+    sequential_ai = OthelloAI(game, algorithm='pvs', **options)
+    start = time.monotonic()
+    sequential_move = sequential_ai.best_move(depth)
+    sequential_time = time.monotonic() - start
+
+    with ParallelSearch(game, workers, **options) as parallel_ai:
+        # Start the worker processes before timing
+        parallel_ai.best_move(1)
+        start = time.monotonic()
+        parallel_move = parallel_ai.best_move(depth)
+        parallel_time = time.monotonic() - start
+    return {
+        'depth': depth,
+        'workers': workers,
+        'sequential_time': sequential_time,
+        'parallel_time': parallel_time,
+        'speedup': sequential_time / parallel_time,
+        'same_move': sequential_move == parallel_move,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the speedup of the parallel root search.")
+    parser.add_argument('--depth', type=int, default=6)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--plies', type=int, default=10, help="moves played before the measured position")
+    args = parser.parse_args()
+
+    game = BitboardOthello()
+    ai = OthelloAI(game)
+    for _ in range(args.plies):
+        move = ai.best_move(2)
+        if move is None:
+            break
+        game.make_move(move[0], move[1], game.current_player)
+        game.switch_player()
+    result = measure_speedup(game, args.depth, args.workers)
+    print(f"depth {result['depth']}, {result['workers']} workers: "
+          f"sequential {result['sequential_time']:.2f}s, parallel {result['parallel_time']:.2f}s, "
+          f"speedup {result['speedup']:.2f}x, same move: {result['same_move']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+import mmap
+import struct
+import sys
+from array import array
+
+from symmetry import SYMMETRIES
+
+# Base shape of every pattern family; the instances are its symmetric images.
+PATTERN_FAMILIES = [
+    ('edge2x', [(0, c) for c in range(8)] + [(1, 1), (1, 6)]),
+    ('corner3x3', [(r, c) for r in range(3) for c in range(3)]),
+    ('corner2x5', [(r, c) for r in range(2) for c in range(5)]),
+    ('hv2', [(1, c) for c in range(8)]),
+    ('hv3', [(2, c) for c in range(8)]),
+    ('hv4', [(3, c) for c in range(8)]),
+    ('diag8', [(i, i) for i in range(8)]),
+    ('diag7', [(i, i + 1) for i in range(7)]),
+    ('diag6', [(i, i + 2) for i in range(6)]),
+    ('diag5', [(i, i + 3) for i in range(5)]),
+    ('diag4', [(i, i + 4) for i in range(4)]),
+]
+
+# Base-3 digit of a square: 0 empty, 1 player 1, 2 player 2 (indexed by player).
+DIGIT = [0, 1, 2]
+
+
+def _instances(shape):
+    seen = set()
+    instances = []
+    for symmetry in SYMMETRIES:
+        squares = [symmetry(r, c) for r, c in shape]
+        if frozenset(squares) not in seen:
+            seen.add(frozenset(squares))
+            instances.append(tuple(r * 8 + c for r, c in squares))
+    return instances
+
+
+# PATTERNS[i] is (family index, squares) for every pattern instance on the board.
+PATTERNS = [(f, squares) for f, (_, shape) in enumerate(PATTERN_FAMILIES) for squares in _instances(shape)]
+
+# For each square, the (pattern instance, power of 3) pairs it contributes to.
+SQUARE_PATTERNS = [[] for _ in range(64)]
+for _i, (_, _squares) in enumerate(PATTERNS):
+    for _k, _sq in enumerate(_squares):
+        SQUARE_PATTERNS[_sq].append((_i, 3 ** _k))
+
+
+def pattern_indices(game):
+    """Compute the base-3 index of every pattern instance from scratch."""
+    indices = [0] * len(PATTERNS)
+    for r in range(8):
+        for c in range(8):
+            player = game.square(r, c)
+            if player:
+                for i, power in SQUARE_PATTERNS[r * 8 + c]:
+                    indices[i] += power * DIGIT[player]
+    return indices
+
+
+WEIGHTS_MAGIC = b'OTPW'
+WEIGHTS_VERSION = 1
+# magic, version, number of phases, number of families, reserved, scale
+WEIGHTS_HEADER = struct.Struct('<4sHHHHf')
+
+# Number of weights of each family: one per base-3 index.
+FAMILY_SIZES = [3 ** len(shape) for _, shape in PATTERN_FAMILIES]
+
+
+def game_phase(disc_count, phases):
+    """Phase of the game (0 to phases - 1) from the number of discs on the board."""
+    return min(phases - 1, (disc_count - 4) * phases // 61)
+
+
+def save_weights(path, tables, scale):
+    """
+    Write pattern weights to a binary file readable by PatternEvaluator.
+
+    Parameters:
+        path (str): The file to write.
+        tables (list): tables[phase][family] is a sequence of FAMILY_SIZES[family] weights.
+        scale (float): Weights are stored as int16 and multiplied by scale when loaded.
+    """
+    with open(path, 'wb') as f:
+        f.write(WEIGHTS_HEADER.pack(WEIGHTS_MAGIC, WEIGHTS_VERSION, len(tables), len(PATTERN_FAMILIES), 0, scale))
+        for phase_tables in tables:
+            for family, table in enumerate(phase_tables):
+                if len(table) != FAMILY_SIZES[family]:
+                    raise ValueError(f"{PATTERN_FAMILIES[family][0]} needs {FAMILY_SIZES[family]} weights")
+                values = array('h', (max(-32768, min(32767, round(w / scale))) for w in table))
+                if sys.byteorder != 'little':
+                    values.byteswap()
+                f.write(values.tobytes())
+
+
+class PatternEvaluator:
+    """
+    Pattern-table evaluation with one weight table per pattern family and game phase.
+
+    The weights file is memory-mapped, so loading is instant and the pages are
+    shared between processes that use the same file. Scores are from player 1's
+    point of view before the sign of the evaluated side is applied.
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, phases, families, _, scale = WEIGHTS_HEADER.unpack_from(self._mmap)
+        if magic != WEIGHTS_MAGIC or version != WEIGHTS_VERSION:
+            raise ValueError(f"{path} is not a pattern weights file")
+        if families != len(PATTERN_FAMILIES):
+            raise ValueError(f"{path} has {families} pattern families, expected {len(PATTERN_FAMILIES)}")
+        if len(self._mmap) != WEIGHTS_HEADER.size + 2 * phases * sum(FAMILY_SIZES):
+            raise ValueError(f"{path} is truncated")
+        if sys.byteorder == 'little':
+            self.weights = memoryview(self._mmap)[WEIGHTS_HEADER.size:].cast('h')
+        else:
+            self.weights = array('h', self._mmap[WEIGHTS_HEADER.size:])
+            self.weights.byteswap()
+        self.phases = phases
+        self.scale = scale
+        # offsets[phase][instance] is where the table of each pattern instance starts
+        family_offsets = [sum(FAMILY_SIZES[:f]) for f in range(families)]
+        self.offsets = [[phase * sum(FAMILY_SIZES) + family_offsets[f] for f, _ in PATTERNS]
+                        for phase in range(phases)]
+
+    def evaluate(self, state, player):
+        """
+        Score a position from its EvalState.
+
+        Parameters:
+            state (EvalState): Evaluation state with track_patterns enabled.
+            player (int): The player whose perspective the score is from.
+
+        Returns:
+            float: The pattern score of the position.
+        """
+        weights = self.weights
+        offsets = self.offsets[game_phase(state.discs[1] + state.discs[-1], self.phases)]
+        total = 0
+        for offset, index in zip(offsets, state.patterns):
+            total += weights[offset + index]
+        return total * self.scale * player
@@ -0,0 +1,123 @@
+"""
+Perft: count the leaf nodes of the game tree to a fixed depth to verify and time move generation.
+
+Check both board backends against the reference counts with:
+    python perft.py --depth 7
+"""
+import argparse
+import time
+
+from bitboard import BitboardOthello
+from othelo import Othello
+
+BACKENDS = {'list': Othello, 'bitboard': BitboardOthello}
+
+# Leaf counts of the start position at depths 1 to 9
+START_COUNTS = [4, 12, 56, 244, 1396, 8200, 55092, 390216, 3005288]
+
+# Positions given by their moves ('a'-'h' is the column, '1'-'8' the row), each a
+# few plies before a pass, with leaf counts at depths 1 to 7 on which both backends agree
+TEST_POSITIONS = [
+    ('pass-a', 'e3f3f4f5c6b7g4e2d2h4f2f1g3c5h5c1g2h2h1g1',
+     [8, 39, 349, 2063, 20505, 141852, 1491297]),
+    ('pass-b', 'c5e6f6c6f4c4b5a6c3c2b3a4b2b1f7g8a3g7b7g4a5a8a7b6d6e7d1d2d3c7a2b4',
+     [11, 75, 953, 7280, 90789, 750256, 8843170]),
+    ('pass-c', 'd6e6f6e7f5c5b5d3c6b7b6d7d8a7a6f4c7b4a4e8a5b8a8g6c4a3',
+     [13, 65, 861, 5642, 72545, 562759, 6909002]),
+]
+
+
+def perft(game, player, depth):
+    """
+    Count the positions reached after exactly depth plies.
+
+    A pass is a ply of its own; a finished game counts as one leaf however deep
+    it ends.
+
+    Parameters:
+        game: The board, either Othello or BitboardOthello.
+        player (int): The player to move.
+        depth (int): The number of plies to play.
+
+    Returns:
+        int: The number of leaf nodes.
+    """
+    if depth == 0:
+        return 1
+    if depth == 1:
+        # Bulk count without building the move list; a pass or a finished game is one leaf
+        return game.mobility(player) or 1
+    valid_moves = game.valid_moves(player)
+    if not valid_moves:
+        if not game.has_valid_move(-player):
+            return 1
+        return perft(game, -player, depth - 1)
+    nodes = 0
+    for move in valid_moves:
+        flip_positions = game.apply_move(move, player)
+        nodes += perft(game, -player, depth - 1)
+        game.undo_move(move, player, flip_positions)
+    return nodes
+
+
+def play_moves(board_class, moves):
+    """
+    Set up a position from the start by playing a move string such as 'f5d6c3'.
+
+    A side without a valid move passes automatically. The board's current_player
+    is set to the player to move.
+
+    Returns:
+        tuple: (board, player to move).
+    """
+    game = board_class()
+    player = 1
+    for i in range(0, len(moves), 2):
+        if not game.has_valid_move(player):
+            player = -player
+        move = (int(moves[i + 1]) - 1, 'abcdefgh'.index(moves[i]))
+        if move not in game.valid_moves(player):
+            raise ValueError(f"illegal move {moves[i:i + 2]} in {moves}")
+        game.make_move(move[0], move[1], player)
+        player = -player
+    game.current_player = player
+    return game, player
+
+
+def run(board_class, depth):
+    """
+    Run perft on the start position and the test positions.
+
+    Returns:
+        list: (position name, depth, nodes, expected nodes or None, seconds) per position.
+    """
+    positions = [('start', '', START_COUNTS)] + TEST_POSITIONS
+    results = []
+    for name, moves, counts in positions:
+        game, player = play_moves(board_class, moves)
+        start = time.monotonic()
+        nodes = perft(game, player, depth)
+        elapsed = time.monotonic() - start
+        results.append((name, depth, nodes, counts[depth - 1] if depth <= len(counts) else None, elapsed))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Count perft leaf nodes and measure move generation speed.")
+    parser.add_argument('--depth', type=int, default=6)
+    parser.add_argument('--backend', choices=sorted(BACKENDS) + ['all'], default='all')
+    args = parser.parse_args()
+
+    failed = False
+    backends = sorted(BACKENDS) if args.backend == 'all' else [args.backend]
+    for backend in backends:
+        for name, depth, nodes, expected, elapsed in run(BACKENDS[backend], args.depth):
+            status = 'unknown' if expected is None else 'ok' if nodes == expected else f'FAIL, expected {expected}'
+            failed |= expected is not None and nodes != expected
+            print(f"{backend:8} {name:7} depth {depth}: {nodes} nodes in {elapsed:.2f}s "
+                  f"({nodes / max(elapsed, 1e-9):.0f} nodes/s) {status}")
+    raise SystemExit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
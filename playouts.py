@@ -0,0 +1,212 @@
+"""
+Batched random playouts: K games advanced one ply at a time with NumPy bitboard operations.
+
+Check the kernel against Othello.apply_move and measure its speed with:
+    python playouts.py --check 200 --boards 4096
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from bitboard import LEFT_SHIFTS, RIGHT_SHIFTS
+from endgame import board_bits
+from othelo import Othello
+
+# The shifts of bitboard.py as uint64 scalars, so NumPy never promotes to float
+_LEFT = [(np.uint64(shift), np.uint64(mask)) for shift, mask in LEFT_SHIFTS]
+_RIGHT = [(np.uint64(shift), np.uint64(mask)) for shift, mask in RIGHT_SHIFTS]
+_SQUARE_BITS = np.uint64(1) << np.arange(64, dtype=np.uint64)
+_ZERO = np.uint64(0)
+
+
+def batch_move_masks(own, opp):
+    """
+    Generate the legal moves of K boards at once.
+
+    Parameters:
+        own (ndarray): uint64 bitboards of the side to move.
+        opp (ndarray): uint64 bitboards of the opponent.
+
+    Returns:
+        ndarray: uint64 bitboards with one bit set for every legal move.
+    """
+    empty = ~(own | opp)
+    moves = np.zeros_like(own)
+    for shift, mask in _LEFT:
+        o = opp & mask
+        t = (own << shift) & o
+        for _ in range(5):
+            t |= (t << shift) & o
+        moves |= (t << shift) & mask & empty
+    for shift, mask in _RIGHT:
+        o = opp & mask
+        t = (own >> shift) & o
+        for _ in range(5):
+            t |= (t >> shift) & o
+        moves |= (t >> shift) & mask & empty
+    return moves
+
+
+def batch_flip_masks(bits, own, opp):
+    """
+    Compute the discs flipped on K boards by placing one disc on each.
+
+    A run of opponent discs is flipped when it is closed by an own disc, exactly as
+    in Othello.make_move; a board whose bit is 0 gets no flips.
+
+    Parameters:
+        bits (ndarray): uint64 single-bit bitboards of the squares being played.
+        own (ndarray): uint64 bitboards of the side to move.
+        opp (ndarray): uint64 bitboards of the opponent.
+
+    Returns:
+        ndarray: uint64 bitboards of the flipped discs.
+    """
+    flips = np.zeros_like(own)
+    for shifts, left in ((_LEFT, True), (_RIGHT, False)):
+        for shift, mask in shifts:
+            line = np.zeros_like(own)
+            closed = np.zeros_like(own)
+            x = ((bits << shift) if left else (bits >> shift)) & mask
+            for _ in range(7):
+                closed |= x & own
+                x &= opp
+                line |= x
+                x = ((x << shift) if left else (x >> shift)) & mask
+            flips |= np.where(closed != 0, line, _ZERO)
+    return flips
+
+
+def popcount(boards):
+    """Count the set bits of every uint64 bitboard."""
+    return np.unpackbits(boards.view(np.uint8)).reshape(len(boards), 64).sum(axis=1, dtype=np.int64)
+
+
+def random_bits(moves, rng):
+    """Pick one set bit uniformly at random from every bitboard (0 for an empty bitboard)."""
+    present = (moves[:, None] & _SQUARE_BITS) != 0
+    counts = present.sum(axis=1)
+    picks = (rng.random(len(moves)) * counts).astype(np.int64)
+    squares = (present.cumsum(axis=1) > picks[:, None]).argmax(axis=1)
+    return np.where(counts > 0, _SQUARE_BITS[squares], _ZERO)
+
+
+def batch_playouts(own, opp, rng=None):
+    """
+    Play K games with uniformly random moves until all of them are over.
+
+    Each step generates the moves of every board, picks one at random, flips the
+    discs and hands the turn over; a board without moves passes, and a board is
+    finished after two passes in a row.
+
+    Parameters:
+        own (ndarray): uint64 bitboards of the side to move.
+        opp (ndarray): uint64 bitboards of the opponent.
+        rng (numpy.random.Generator): Source of the random moves.
+
+    Returns:
+        ndarray: The final disc differences from the perspective of the side to move at the start.
+    """
+    rng = rng or np.random.default_rng()
+    own = np.array(own, dtype=np.uint64)
+    opp = np.array(opp, dtype=np.uint64)
+    sign = np.ones(len(own), dtype=np.int64)
+    passed = np.zeros(len(own), dtype=bool)
+    active = np.ones(len(own), dtype=bool)
+    while active.any():
+        moves = batch_move_masks(own, opp)
+        has_move = moves != 0
+        active &= has_move | ~passed
+        bits = random_bits(moves, rng)
+        flips = batch_flip_masks(bits, own, opp)
+        # A pass has no bit and no flips, so it only swaps the sides
+        own, opp = np.where(active, opp ^ flips, own), np.where(active, own | flips | bits, opp)
+        sign = np.where(active, -sign, sign)
+        passed = np.where(active, ~has_move, passed)
+    return sign * (popcount(own) - popcount(opp))
+
+
+def monte_carlo_score(game, player, playouts=1024, rng=None):
+    """
+    Score a position by the mean final disc difference of random playouts.
+
+    Parameters:
+        game: The board, either Othello or BitboardOthello.
+        player (int): The player to score the position for.
+        playouts (int): Number of games played out in one batch.
+
+    Returns:
+        float: The mean disc difference for player.
+    """
+    own, opp = board_bits(game, player)
+    if game.current_player == player:
+        diffs = batch_playouts(np.full(playouts, own, dtype=np.uint64), np.full(playouts, opp, dtype=np.uint64), rng)
+    else:
+        diffs = -batch_playouts(np.full(playouts, opp, dtype=np.uint64), np.full(playouts, own, dtype=np.uint64), rng)
+    return float(diffs.mean())
+
+
+def check_against_othello(games=100, seed=0):
+    """
+    Compare the kernel with Othello.valid_moves and Othello.apply_move over random games.
+
+    Every move of every position reached is checked in one batch per position.
+
+    Returns:
+        int: The number of moves checked.
+
+    Raises:
+        AssertionError: If a move list or a set of flipped discs differs.
+    """
+    rng = random.Random(seed)
+    checked = 0
+    for _ in range(games):
+        game = Othello()
+        player = 1
+        while True:
+            valid_moves = game.valid_moves(player)
+            if not valid_moves:
+                if not game.valid_moves(-player):
+                    break
+                player = -player
+                continue
+            own, opp = board_bits(game, player)
+            own_batch = np.full(len(valid_moves), own, dtype=np.uint64)
+            opp_batch = np.full(len(valid_moves), opp, dtype=np.uint64)
+            expected = sum(1 << (r * 8 + c) for r, c in valid_moves)
+            assert int(batch_move_masks(own_batch[:1], opp_batch[:1])[0]) == expected, valid_moves
+            bits = np.array([1 << (r * 8 + c) for r, c in valid_moves], dtype=np.uint64)
+            flips = batch_flip_masks(bits, own_batch, opp_batch)
+            for move, mask in zip(valid_moves, flips):
+                flip_positions = game.apply_move(move, player)
+                game.undo_move(move, player, flip_positions)
+                assert int(mask) == sum(1 << (r * 8 + c) for r, c in flip_positions), move
+            checked += len(valid_moves)
+            move = rng.choice(valid_moves)
+            game.make_move(move[0], move[1], player)
+            player = -player
+    return checked
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check and time the batched playout kernel.")
+    parser.add_argument('--check', type=int, default=100, help="random games compared with Othello")
+    parser.add_argument('--boards', type=int, default=4096, help="games played out in one batch")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    if args.check:
+        print(f"{check_against_othello(args.check, args.seed)} moves match Othello.apply_move")
+    own, opp = board_bits(Othello(), 1)
+    rng = np.random.default_rng(args.seed)
+    start = time.monotonic()
+    diffs = batch_playouts(np.full(args.boards, own, dtype=np.uint64), np.full(args.boards, opp, dtype=np.uint64), rng)
+    elapsed = time.monotonic() - start
+    print(f"{args.boards} playouts in {elapsed:.2f}s ({args.boards / elapsed:.0f}/s), "
+          f"mean disc difference {diffs.mean():+.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+import threading
+
+
+class Ponderer:
+    """
+    Searches the opponent's position in a background thread while they think.
+
+    Pondering runs iterative deepening with the AI's own search on the position in
+    front of the opponent, so the transposition table fills with the positions
+    after every reply. When the real move arrives, the AI's search of the new
+    position finds those entries and reaches the pondered depth almost at once.
+    input() releases the GIL, so the thread gets the CPU while the game waits.
+    """
+
+    def __init__(self, ai):
+        """
+        Parameters:
+            ai: The OthelloAI whose board and transposition table are used.
+        """
+        self.ai = ai
+        self.completed_depth = 0
+        self.predicted_move = None
+        self._thread = None
+        self._stop = False
+
+    def start(self):
+        """Start pondering the current position; the board must not be touched until stop."""
+        self.completed_depth = 0
+        self.predicted_move = None
+        self._stop = False
+        # stop sets a deadline in the past to interrupt the search
+        self.ai._next_check = self.ai.nodes + self.ai.check_interval
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        ai = self.ai
+        for depth in range(1, ai.game.empty_count() + 1):
+            move = ai.best_move(depth)
+            if ai.stopped or self._stop:
+                break
+            self.completed_depth = depth
+            self.predicted_move = move
+
+    def stop(self):
+        """Stop pondering and wait until the search has restored the board."""
+        if self._thread is None:
+            return
+        self._stop = True
+        self.ai.deadline = 0
+        self._thread.join()
+        self._thread = None
+        self.ai.deadline = None
+        self.ai.stopped = False
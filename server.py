@@ -0,0 +1,251 @@
+"""
+Asyncio game server: many human-vs-AI games over a line-based TCP protocol.
+
+Start it with:
+    python server.py --port 7777 --workers 8
+
+and play with e.g. `nc localhost 7777`. Each connection plays one game at a time.
+Commands and replies are single lines:
+
+    NEW [X|O]       start a game as X (moves first) or O; the AI moves first as X
+    MOVE row col    play a move; the reply is followed by the AI's moves
+    PASS            pass when you have no valid move
+    BOARD           the board as 64 characters of '.', 'X' and 'O', row by row
+    MOVES           your valid moves
+    QUIT            close the connection
+
+Replies start with OK, ERR, AI (an AI move "AI row col" or "AI PASS"), BOARD, MOVES
+or END (the final disc counts "END x o"). If the AI's search fails, the reply is
+"ERR search failed ..." and the AI tries its move again on the next command.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from endgame import board_bits
+from engine import init_worker, search_position
+from othelo import Othello
+
+
+class GameSession:
+    """
+    One game between a connected player and the AI, with the AI's clock.
+
+    The AI gets game_time seconds for the whole game; each move may use the
+    remaining time divided by the moves it still has to play, at most move_time.
+    """
+
+    def __init__(self, human, board_class=Othello, game_time=60.0, move_time=5.0):
+        self.game = board_class()
+        self.human = human
+        self.clock = game_time
+        self.move_time = move_time
+
+    def move_budget(self):
+        moves_left = max(1, (self.game.empty_count() + 1) // 2)
+        return max(0.01, min(self.move_time, self.clock / moves_left))
+
+    def is_over(self):
+        return not self.game.has_valid_move(1) and not self.game.has_valid_move(-1)
+
+    def board_line(self):
+        return ''.join('.XO'[self.game.square(r, c)] for r in range(8) for c in range(8))
+
+
+class GameServer:
+    """
+    Serves games over TCP; AI searches run in a process pool so the event loop never blocks.
+
+    At most one search per worker runs at a time. A connection waiting for a
+    free worker stops reading its socket, which pushes the backpressure back to
+    the client through TCP flow control.
+    """
+
+    def __init__(self, workers=None, board_class=Othello, game_time=60.0, move_time=5.0, **options):
+        """
+        Parameters:
+            workers (int): Number of worker processes, os.cpu_count() by default.
+            board_class: The board used for the games.
+            game_time (float): Seconds the AI may think in one game.
+            move_time (float): Maximum seconds the AI may think on one move.
+            options: Further OthelloAI options used by the workers.
+        """
+        self.workers = workers or os.cpu_count()
+        self.board_class = board_class
+        self.game_time = game_time
+        self.move_time = move_time
+        self.options = options
+        self._pool = self._new_pool()
+        self._slots = None
+        self._server = None
+        self._writers = set()
+        self.games_started = 0
+
+    def _new_pool(self):
+        # Forked workers would inherit the sockets of open connections and keep them open
+        return ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('spawn'),
+                                   initializer=init_worker, initargs=(self.options,))
+
+    async def start(self, host='127.0.0.1', port=7777):
+        self._slots = asyncio.Semaphore(self.workers)
+        self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server
+
+    @property
+    def port(self):
+        return self._server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._writers):
+                writer.close()
+            await self._server.wait_closed()
+        self._pool.shutdown()
+
+    async def _ai_turn(self, session):
+        """Play the AI's move, or pass; returns the reply line."""
+        game = session.game
+        player = game.current_player
+        if not game.has_valid_move(player):
+            game.switch_player()
+            return "AI PASS"
+        budget = session.move_budget()
+        p1, p2 = board_bits(game, 1)
+        loop = asyncio.get_running_loop()
+        async with self._slots:
+            start = time.monotonic()
+            pool = self._pool
+            try:
+                move, _ = await loop.run_in_executor(pool, search_position, p1, p2, player, budget)
+            except BrokenProcessPool:
+                # A dead worker breaks the whole pool; replace it once for all waiting games
+                if self._pool is pool:
+                    self._pool = self._new_pool()
+                    pool.shutdown(wait=False)
+                raise
+            finally:
+                session.clock -= time.monotonic() - start
+        game.make_move(move[0], move[1], player)
+        game.switch_player()
+        return f"AI {move[0]} {move[1]}"
+
+    async def _ai_replies(self, session, writer):
+        """Let the AI move until it is the human's turn or the game ends."""
+        while not session.is_over():
+            if session.game.current_player == session.human:
+                return
+            try:
+                reply = await self._ai_turn(session)
+            except Exception as e:
+                # The game stays at the AI's turn, and the next command retries the search
+                writer.write(f"ERR search failed: {type(e).__name__}: {e}\n".encode())
+                return
+            writer.write((reply + "\n").encode())
+            await writer.drain()
+        if session.is_over():
+            writer.write(f"END {session.game.count(1)} {session.game.count(-1)}\n".encode())
+            await writer.drain()
+
+    async def _command(self, session, words, writer):
+        """Run one command; returns the session, which NEW replaces."""
+        command = words[0].upper()
+        if command == 'NEW':
+            human = -1 if len(words) > 1 and words[1].upper() == 'O' else 1
+            session = GameSession(human, self.board_class, self.game_time, self.move_time)
+            self.games_started += 1
+            writer.write(b"OK\n")
+            await self._ai_replies(session, writer)
+            return session
+        if session is None:
+            writer.write(b"ERR no game, send NEW\n")
+            return session
+        game = session.game
+        if not session.is_over() and game.current_player != session.human:
+            # The AI's last search failed; it has to move before anything else
+            await self._ai_replies(session, writer)
+            if not session.is_over() and game.current_player != session.human:
+                return session
+        if command == 'BOARD':
+            writer.write(f"BOARD {session.board_line()}\n".encode())
+        elif command == 'MOVES':
+            moves = ' '.join(f"{r},{c}" for r, c in sorted(game.valid_moves(session.human)))
+            writer.write(f"MOVES {moves}\n".encode())
+        elif session.is_over() or game.current_player != session.human:
+            writer.write(b"ERR not your turn\n")
+        elif command == 'PASS':
+            if game.has_valid_move(session.human):
+                writer.write(b"ERR you have a valid move\n")
+            else:
+                game.switch_player()
+                writer.write(b"OK\n")
+                await self._ai_replies(session, writer)
+        elif command == 'MOVE':
+            try:
+                move = (int(words[1]), int(words[2]))
+            except (IndexError, ValueError):
+                writer.write(b"ERR usage: MOVE row col\n")
+                return session
+            if move not in game.valid_moves(session.human):
+                writer.write(b"ERR invalid move\n")
+                return session
+            game.make_move(move[0], move[1], session.human)
+            game.switch_player()
+            writer.write(b"OK\n")
+            await self._ai_replies(session, writer)
+        else:
+            writer.write(f"ERR unknown command {words[0]}\n".encode())
+        return session
+
+    async def _handle(self, reader, writer):
+        session = None
+        self._writers.add(writer)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                words = line.decode(errors='replace').split()
+                if not words:
+                    continue
+                if words[0].upper() == 'QUIT':
+                    break
+                session = await self._command(session, words, writer)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+
+async def serve(host, port, workers, game_time, move_time):
+    server = GameServer(workers, game_time=game_time, move_time=move_time)
+    await server.start(host, port)
+    print(f"serving on {host}:{server.port} with {server.workers} workers")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve human-vs-AI games over TCP.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=7777)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--game-time', type=float, default=60.0, help="AI seconds per game")
+    parser.add_argument('--move-time', type=float, default=5.0, help="maximum AI seconds per move")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.game_time, args.move_time))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
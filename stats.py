@@ -0,0 +1,119 @@
+import time
+
+# Functions whose calls are counted and timed
+TIMED = ('valid_moves', 'mobility', 'evaluate_board', 'apply_move', 'undo_move')
+
+
+class SearchStats:
+    """
+    Counters of what a search did, filled by instrumented wrappers.
+
+    OthelloAI.search resets the counters; best_move calls add to them until reset.
+
+    instrument() replaces the hot methods of one OthelloAI and its board with
+    wrappers that update these counters, so a search without stats runs the plain
+    methods and pays nothing. The times are inclusive: the heuristic evaluation
+    counts mobility with the board's mobility method, so evaluate_board's time
+    includes the time counted under mobility.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.nodes = 0
+        self.leaves = 0
+        self.beta_cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.max_depth = 0
+        self.calls = dict.fromkeys(TIMED, 0)
+        self.seconds = dict.fromkeys(TIMED, 0.0)
+        # First move of the ordered move list at each ply, to tell first-move cutoffs apart
+        self._first_moves = {}
+
+    @property
+    def first_move_cutoff_rate(self):
+        """Fraction of the beta cutoffs caused by the first move searched; 1.0 is perfect ordering."""
+        return self.first_move_cutoffs / self.beta_cutoffs if self.beta_cutoffs else None
+
+    def as_dict(self):
+        return {
+            'nodes': self.nodes,
+            'leaves': self.leaves,
+            'beta_cutoffs': self.beta_cutoffs,
+            'first_move_cutoffs': self.first_move_cutoffs,
+            'max_depth': self.max_depth,
+            'calls': dict(self.calls),
+            'seconds': dict(self.seconds),
+        }
+
+    def __str__(self):
+        lines = [f"nodes {self.nodes}, leaves {self.leaves}, max depth {self.max_depth}",
+                 f"beta cutoffs {self.beta_cutoffs}, at the first move {self.first_move_cutoffs}"]
+        for name in TIMED:
+            lines.append(f"{name:15} {self.calls[name]:>9} calls {self.seconds[name]:8.3f}s")
+        return '\n'.join(lines)
+
+
+def _timed(stats, name, func, after=None):
+    perf_counter = time.perf_counter
+
+    def wrapper(*args):
+        start = perf_counter()
+        result = func(*args)
+        stats.seconds[name] += perf_counter() - start
+        stats.calls[name] += 1
+        if after is not None:
+            after()
+        return result
+    return wrapper
+
+
+def _counted(stats, func):
+    def wrapper(*args):
+        stats.nodes += 1
+        return func(*args)
+    return wrapper
+
+
+def instrument(ai, stats):
+    """
+    Install wrappers that record into stats on an OthelloAI, its board and its move orderer.
+
+    The wrappers are instance attributes that shadow the methods, so only this AI,
+    its board and its orderer are affected; valid_moves and mobility calls made
+    on the same board by anything else are counted as well.
+    """
+    def count_leaf():
+        stats.leaves += 1
+
+    def track_depth():
+        depth = len(ai._hash_stack)
+        if depth > stats.max_depth:
+            stats.max_depth = depth
+
+    ai.minimax = _counted(stats, ai.minimax)
+    ai.pvs = _counted(stats, ai.pvs)
+    ai.evaluate_board = _timed(stats, 'evaluate_board', ai.evaluate_board, count_leaf)
+    ai.apply_move = _timed(stats, 'apply_move', ai.apply_move, track_depth)
+    ai.undo_move = _timed(stats, 'undo_move', ai.undo_move)
+    ai.game.valid_moves = _timed(stats, 'valid_moves', ai.game.valid_moves)
+    ai.game.mobility = _timed(stats, 'mobility', ai.game.mobility)
+
+    order = ai.orderer.order
+    update = ai.orderer.update
+
+    def counting_order(moves, player, ply, hash_move=None):
+        order(moves, player, ply, hash_move)
+        if moves:
+            stats._first_moves[ply] = moves[0]
+
+    def counting_update(move, player, ply, depth):
+        # The orderer is told about every beta cutoff
+        stats.beta_cutoffs += 1
+        if stats._first_moves.get(ply) == move:
+            stats.first_move_cutoffs += 1
+        update(move, player, ply, depth)
+
+    ai.orderer.order = counting_order
+    ai.orderer.update = counting_update
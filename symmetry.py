@@ -0,0 +1,26 @@
+"""
+The 8 symmetries of the board: square maps, their inverses and moves through them.
+"""
+
+# The 8 symmetries of the board as functions of (row, col).
+SYMMETRIES = [
+    lambda r, c: (r, c),
+    lambda r, c: (r, 7 - c),
+    lambda r, c: (7 - r, c),
+    lambda r, c: (7 - r, 7 - c),
+    lambda r, c: (c, r),
+    lambda r, c: (c, 7 - r),
+    lambda r, c: (7 - c, r),
+    lambda r, c: (7 - c, 7 - r),
+]
+
+# SQUARE_MAP[sym][square] is the image of a square under each symmetry.
+SQUARE_MAP = [[r * 8 + c for r, c in (symmetry(sq // 8, sq % 8) for sq in range(64))] for symmetry in SYMMETRIES]
+# Index of the symmetry that undoes each one; only the two quarter turns differ.
+INVERSE = [[s for s in range(8) if all(SQUARE_MAP[s][SQUARE_MAP[t][sq]] == sq for sq in range(64))][0]
+           for t in range(8)]
+
+
+def transform_move(move, sym):
+    """Map a (row, col) move through a symmetry."""
+    return divmod(SQUARE_MAP[sym][move[0] * 8 + move[1]], 8)
@@ -0,0 +1,42 @@
+import unittest
+
+from bench import POSITIONS
+from bitboard import BitboardOthello
+from bot import ALGORITHMS, OthelloAI
+from othelo import Othello
+from perft import TEST_POSITIONS, play_moves
+
+MIDGAME = [moves for name, moves, _ in POSITIONS if name.startswith('mid')] + \
+    [moves for _, moves, _ in TEST_POSITIONS]
+
+
+def move_value(game, move, depth):
+    """Value of the move for the player to move, by plain alpha-beta without a table."""
+    ai = OthelloAI(game, tt_size_mb=None, endgame_threshold=0)
+    player = game.current_player
+    flip_positions = ai.apply_move(move, player)
+    value = ai.minimax(depth - 1, False)
+    ai.undo_move(move, player, flip_positions)
+    return value
+
+
+class SearchAgreementTest(unittest.TestCase):
+    def test_algorithms_agree_on_value_and_move(self):
+        for board_class in (Othello, BitboardOthello):
+            for moves in MIDGAME:
+                game, _ = play_moves(board_class, moves)
+                for depth in (3, 4, 5):
+                    reference = OthelloAI(game, tt_size_mb=None, endgame_threshold=0)
+                    reference.best_move(depth)
+                    for algorithm in ALGORITHMS:
+                        for canonical in (False, True):
+                            with self.subTest(board=board_class.__name__, moves=moves, depth=depth,
+                                              algorithm=algorithm, canonical=canonical):
+                                ai = OthelloAI(game, algorithm=algorithm, canonical=canonical, endgame_threshold=0)
+                                move = ai.search(max_depth=depth)
+                                self.assertAlmostEqual(ai.best_eval, reference.best_eval, places=4)
+                                self.assertAlmostEqual(move_value(game, move, depth), reference.best_eval, places=4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import asyncio
+import time
+import unittest
+
+from server import GameServer
+
+
+async def send(reader, writer, line, replies=1):
+    """Send one command and read the given number of reply lines."""
+    writer.write(f"{line}\n".encode())
+    await writer.drain()
+    return [(await asyncio.wait_for(reader.readline(), 30)).decode().strip() for _ in range(replies)]
+
+
+class GameServerTest(unittest.TestCase):
+    def play(self, scenario):
+        async def run():
+            server = GameServer(workers=1, game_time=5.0, move_time=0.05)
+            await server.start(port=0)
+            reader, writer = await asyncio.open_connection('127.0.0.1', server.port)
+            try:
+                await scenario(server, reader, writer)
+                # Let the server finish the connection before shutting it down
+                writer.write(b"QUIT\n")
+                await asyncio.wait_for(reader.read(), 30)
+            finally:
+                writer.close()
+                await server.close()
+        asyncio.run(run())
+
+    def test_game_over_socket(self):
+        async def scenario(server, reader, writer):
+            self.assertEqual(await send(reader, writer, "MOVES"), ["ERR no game, send NEW"])
+            self.assertEqual(await send(reader, writer, "NEW X"), ["OK"])
+            self.assertEqual(await send(reader, writer, "MOVES"), ["MOVES 2,4 3,5 4,2 5,3"])
+            self.assertEqual(await send(reader, writer, "PASS"), ["ERR you have a valid move"])
+            self.assertEqual(await send(reader, writer, "MOVE 0 0"), ["ERR invalid move"])
+            ok, ai = await send(reader, writer, "MOVE 2 4", replies=2)
+            self.assertEqual(ok, "OK")
+            self.assertRegex(ai, r"^AI \d \d$")
+            board = (await send(reader, writer, "BOARD"))[0]
+            self.assertEqual(board.split()[1].count('.'), 58)
+        self.play(scenario)
+
+    def test_worker_failure_is_reported_and_recovered(self):
+        async def scenario(server, reader, writer):
+            self.assertEqual(await send(reader, writer, "NEW X"), ["OK"])
+            await send(reader, writer, "MOVE 2 4", replies=2)
+            # Kill the worker so that the next search finds the pool broken
+            for process in list(server._pool._processes.values()):
+                process.kill()
+            time.sleep(0.5)
+            moves = (await send(reader, writer, "MOVES"))[0].split()[1:]
+            row, col = moves[0].split(',')
+            ok, error = await send(reader, writer, f"MOVE {row} {col}", replies=2)
+            self.assertEqual(ok, "OK")
+            self.assertTrue(error.startswith("ERR search failed"), error)
+            # The next command retries the AI's move on a new pool
+            ai, board = await send(reader, writer, "BOARD", replies=2)
+            self.assertRegex(ai, r"^AI \d \d$")
+            self.assertTrue(board.startswith("BOARD "))
+        self.play(scenario)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,245 @@
+"""
+Self-play training pipeline for the pattern evaluation weights.
+
+Worker processes play games between OthelloAI instances, label the positions
+with the exact endgame score or a deeper search, and stream the samples to
+chunk files. The weights are then fitted with batched NumPy SGD and written in
+the format read by PatternEvaluator.
+
+Usage:
+    python train.py --games 2000 --workers 32 --data samples/ --out weights.bin
+"""
+import argparse
+import glob
+import os
+import random
+import time
+from multiprocessing import Pool
+
+import numpy as np
+
+from bitboard import BitboardOthello
+from bot import OthelloAI
+from endgame import EndgameSolver, final_score
+from evaluation import EvalState
+from patterns import FAMILY_SIZES, PATTERNS, PatternEvaluator, save_weights
+
+# Weights are stored as int16 multiples of this many discs.
+WEIGHT_SCALE = 0.01
+
+
+def self_play_game(rng, play_depth, random_moves):
+    """
+    Play one game between two OthelloAI instances.
+
+    Parameters:
+        rng (random.Random): Source of the random opening moves.
+        play_depth (int): Search depth of both players.
+        random_moves (int): Number of random moves at the start, for variety.
+
+    Returns:
+        tuple: The positions as ((player 1 bits, player 2 bits), player to move) and
+            the final disc difference for player 1.
+    """
+    game = BitboardOthello()
+    players = {1: OthelloAI(game, tt_size_mb=4), -1: OthelloAI(game, tt_size_mb=4)}
+    positions = []
+    plies = 0
+    while True:
+        player = game.current_player
+        if game.has_valid_move(player):
+            positions.append(((game.discs[1], game.discs[-1]), player))
+            if plies < random_moves:
+                move = rng.choice(game.valid_moves(player))
+            else:
+                move = players[player].search(max_depth=play_depth)
+            game.make_move(move[0], move[1], player)
+            plies += 1
+        elif not game.has_valid_move(-player):
+            break
+        game.switch_player()
+    return positions, final_score(game.discs[1], game.discs[-1])
+
+
+def label_positions(positions, result, exact_empties, label_ai, label_depth):
+    """
+    Label positions with scores from player 1's point of view.
+
+    Positions with at most exact_empties empty squares get their exact endgame
+    score. Earlier positions get the value of a deeper search with label_ai when
+    it is given, and the final result of the game otherwise.
+    """
+    solver = EndgameSolver()
+    labels = []
+    for discs, player in positions:
+        game = BitboardOthello.from_bits(discs[0], discs[1], player)
+        if game.empty_count() <= exact_empties:
+            score = solver.solve(game, player).score * player
+        elif label_ai is not None:
+            label_ai.game = game
+            label_ai.search(max_depth=label_depth)
+            score = label_ai.best_eval * player
+        else:
+            score = result
+        labels.append(score)
+    return labels
+
+
+def write_chunk(path, samples):
+    indices = np.array([s[0] for s in samples], dtype=np.int32)
+    discs = np.array([s[1] for s in samples], dtype=np.int8)
+    targets = np.array([s[2] for s in samples], dtype=np.float32)
+    np.savez(path, indices=indices, discs=discs, targets=targets)
+
+
+def run_worker(task):
+    """
+    Play and label games in one worker process, writing a chunk every chunk_size samples.
+
+    Returns:
+        int: The number of samples written.
+    """
+    worker_id, games, seed, options = task
+    rng = random.Random(seed)
+    label_ai = None
+    if options['init']:
+        label_ai = OthelloAI(BitboardOthello(), evaluator=PatternEvaluator(options['init']), endgame_threshold=0)
+    samples = []
+    written = 0
+    chunk = 0
+    for _ in range(games):
+        positions, result = self_play_game(rng, options['play_depth'], options['random_moves'])
+        labels = label_positions(positions, result, options['exact_empties'], label_ai, options['label_depth'])
+        for (discs, player), label in zip(positions, labels):
+            game = BitboardOthello.from_bits(discs[0], discs[1], player)
+            state = EvalState(game, track_patterns=True)
+            samples.append((state.patterns, state.discs[1] + state.discs[-1], label))
+        if len(samples) >= options['chunk_size']:
+            write_chunk(os.path.join(options['data'], f'chunk-{worker_id:03d}-{chunk:05d}.npz'), samples)
+            written += len(samples)
+            chunk += 1
+            samples = []
+    if samples:
+        write_chunk(os.path.join(options['data'], f'chunk-{worker_id:03d}-{chunk:05d}.npz'), samples)
+        written += len(samples)
+    return written
+
+
+def generate(games, workers, options, seed=0):
+    """Play games in parallel worker processes and stream the samples to options['data']."""
+    os.makedirs(options['data'], exist_ok=True)
+    per_worker = [games // workers + (i < games % workers) for i in range(workers)]
+    tasks = [(i, n, seed * 1000003 + i, options) for i, n in enumerate(per_worker) if n]
+    with Pool(len(tasks)) as pool:
+        return sum(pool.map(run_worker, tasks))
+
+
+def fit(data, phases, epochs=10, learning_rate=0.5, batch_size=4096, init=None):
+    """
+    Fit the pattern weights to the samples with batched SGD.
+
+    Every weight is updated with the mean error of the samples that used it in the
+    batch, so rare pattern configurations are not drowned out by common ones.
+
+    Parameters:
+        data (str): Directory with the chunk files written by generate.
+        phases (int): Number of game phases, each with its own tables.
+        epochs (int): Number of passes over the samples.
+        learning_rate (float): Step size of the SGD updates.
+        batch_size (int): Number of samples per update.
+        init (str): Weights file to start from, or None to start from zero.
+
+    Returns:
+        numpy.ndarray: All weights, laid out like the PatternEvaluator file.
+    """
+    table_size = sum(FAMILY_SIZES)
+    family_offsets = np.cumsum([0] + FAMILY_SIZES[:-1])
+    instance_offsets = np.array([family_offsets[f] for f, _ in PATTERNS], dtype=np.int64)
+    if init:
+        evaluator = PatternEvaluator(init)
+        if evaluator.phases != phases:
+            raise ValueError(f"{init} has {evaluator.phases} phases, expected {phases}")
+        weights = np.array(evaluator.weights, dtype=np.float64) * evaluator.scale
+    else:
+        weights = np.zeros(phases * table_size)
+
+    chunks = sorted(glob.glob(os.path.join(data, 'chunk-*.npz')))
+    if not chunks:
+        raise ValueError(f"No samples in {data}")
+    for epoch in range(epochs):
+        squared_error = 0.0
+        count = 0
+        random.shuffle(chunks)
+        for path in chunks:
+            with np.load(path) as chunk:
+                indices, discs, targets = chunk['indices'], chunk['discs'], chunk['targets']
+            # Same as patterns.game_phase
+            phase = np.minimum(phases - 1, (discs.astype(np.int64) - 4) * phases // 61)
+            order = np.random.permutation(len(targets))
+            for start in range(0, len(order), batch_size):
+                batch = order[start:start + batch_size]
+                slots = (phase[batch, None] * table_size + instance_offsets[None, :] + indices[batch]).ravel()
+                predictions = weights[slots].reshape(len(batch), -1).sum(axis=1)
+                errors = predictions - targets[batch]
+                gradient = np.bincount(slots, weights=np.repeat(errors, len(PATTERNS)), minlength=len(weights))
+                uses = np.bincount(slots, minlength=len(weights))
+                weights -= learning_rate * gradient / np.maximum(uses, 1) / len(PATTERNS)
+                squared_error += float(errors @ errors)
+                count += len(batch)
+        print(f"epoch {epoch + 1}: rmse {np.sqrt(squared_error / count):.3f} discs over {count} samples")
+    return weights
+
+
+def write_weights(path, weights, phases):
+    table_size = sum(FAMILY_SIZES)
+    tables = []
+    for phase in range(phases):
+        start = phase * table_size
+        phase_tables = []
+        for size in FAMILY_SIZES:
+            phase_tables.append(weights[start:start + size].tolist())
+            start += size
+        tables.append(phase_tables)
+    save_weights(path, tables, WEIGHT_SCALE)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train pattern evaluation weights by self-play.")
+    parser.add_argument('--games', type=int, default=1000, help="number of self-play games (0 to only fit)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="number of worker processes")
+    parser.add_argument('--data', default='samples', help="directory for the sample chunks")
+    parser.add_argument('--out', default='weights.bin', help="weights file to write")
+    parser.add_argument('--init', help="weights file used for labelling and as the starting point")
+    parser.add_argument('--phases', type=int, default=12)
+    parser.add_argument('--play-depth', type=int, default=2)
+    parser.add_argument('--label-depth', type=int, default=4)
+    parser.add_argument('--random-moves', type=int, default=8)
+    parser.add_argument('--exact-empties', type=int, default=12)
+    parser.add_argument('--chunk-size', type=int, default=50000)
+    parser.add_argument('--epochs', type=int, default=10)
+    parser.add_argument('--learning-rate', type=float, default=0.5)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    options = {
+        'data': args.data,
+        'init': args.init,
+        'play_depth': args.play_depth,
+        'label_depth': args.label_depth,
+        'random_moves': args.random_moves,
+        'exact_empties': args.exact_empties,
+        'chunk_size': args.chunk_size,
+    }
+    if args.games:
+        start = time.monotonic()
+        samples = generate(args.games, args.workers, options, args.seed)
+        print(f"{samples} samples from {args.games} games in {time.monotonic() - start:.1f}s")
+    np.random.seed(args.seed)
+    random.seed(args.seed)
+    weights = fit(args.data, args.phases, args.epochs, args.learning_rate, init=args.init)
+    write_weights(args.out, weights, args.phases)
+    print(f"wrote {args.out}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,319 @@
+import random
+import struct
+import sys
+from array import array
+from multiprocessing import shared_memory
+
+from evaluation import flipped_squares
+from symmetry import INVERSE, SQUARE_MAP
+
+EXACT, LOWER, UPPER = 0, 1, 2
+
+# Bytes used by one entry: key, value, depth, bound, move and age.
+ENTRY_BYTES = 8 + 8 + 1 + 1 + 1 + 1
+
+REPLACEMENT_POLICIES = ('depth', 'always')
+
+_rng = random.Random(0x07E110)
+
+# ZOBRIST[player][square] for player 1 and -1; index 0 is unused.
+ZOBRIST = [None, [_rng.getrandbits(64) for _ in range(64)], [_rng.getrandbits(64) for _ in range(64)]]
+ZOBRIST[-1] = ZOBRIST[2]
+# Flipping a disc removes one colour from the square and adds the other.
+ZOBRIST_FLIP = [a ^ b for a, b in zip(ZOBRIST[1], ZOBRIST[-1])]
+SIDE_KEY = _rng.getrandbits(64)
+
+# Zobrist keys of the transformed board: ZOBRIST_SYM[sym][player][square] is the key
+# the square contributes to the image of the board under sym.
+ZOBRIST_SYM = []
+ZOBRIST_FLIP_SYM = []
+for _map in SQUARE_MAP:
+    _keys = [None, [ZOBRIST[1][_map[sq]] for sq in range(64)], [ZOBRIST[-1][_map[sq]] for sq in range(64)]]
+    _keys[-1] = _keys[2]
+    ZOBRIST_SYM.append(_keys)
+    ZOBRIST_FLIP_SYM.append([ZOBRIST_FLIP[_map[sq]] for sq in range(64)])
+
+_FLOAT = struct.Struct('<f')
+_UINT = struct.Struct('<I')
+
+
+def zobrist_hash(game):
+    """
+    Compute the Zobrist key of the discs on the board from scratch.
+
+    The side to move is not part of this key; XOR in SIDE_KEY when player 2 is to move.
+    """
+    key = 0
+    for r in range(8):
+        for c in range(8):
+            player = game.square(r, c)
+            if player:
+                key ^= ZOBRIST[player][r * 8 + c]
+    return key
+
+
+def move_delta(move, player, flips):
+    """
+    Compute the change of the Zobrist key caused by a move.
+
+    Parameters:
+        move (tuple): The move that was played.
+        player (int): The player who made the move.
+        flips: The flipped pieces returned by the board's apply_move.
+
+    Returns:
+        int: The value to XOR into the key; applying it twice undoes the move.
+    """
+    row, col = move
+    delta = ZOBRIST[player][row * 8 + col]
+    if isinstance(flips, int):
+        while flips:
+            lsb = flips & -flips
+            delta ^= ZOBRIST_FLIP[lsb.bit_length() - 1]
+            flips ^= lsb
+    else:
+        for fr, fc in flips:
+            delta ^= ZOBRIST_FLIP[fr * 8 + fc]
+    return delta
+
+
+def symmetric_keys(game):
+    """Compute the Zobrist keys of the 8 images of the board from scratch."""
+    keys = [0] * 8
+    for r in range(8):
+        for c in range(8):
+            player = game.square(r, c)
+            if player:
+                for sym in range(8):
+                    keys[sym] ^= ZOBRIST_SYM[sym][player][r * 8 + c]
+    return keys
+
+
+def canonical_key(keys, player):
+    """
+    Choose the canonical key of a position from its 8 symmetric keys.
+
+    Every image of a position has the same set of symmetric keys, so the smallest
+    one identifies the position up to symmetry.
+
+    Returns:
+        tuple: (key with the side to move, symmetry that maps the board to the canonical image).
+    """
+    key = min(keys)
+    sym = keys.index(key)
+    return (key ^ SIDE_KEY if player == -1 else key), sym
+
+
+def symmetric_move_keys(keys, move, player, flips):
+    """
+    Update the 8 symmetric keys for a move.
+
+    Parameters:
+        keys (list): The symmetric keys before the move.
+        move (tuple): The move that was played.
+        player (int): The player who made the move.
+        flips: The flipped pieces returned by the board's apply_move.
+
+    Returns:
+        list: The symmetric keys after the move.
+    """
+    placed = move[0] * 8 + move[1]
+    squares = flipped_squares(flips)
+    new_keys = []
+    for sym in range(8):
+        key = keys[sym] ^ ZOBRIST_SYM[sym][player][placed]
+        flip_keys = ZOBRIST_FLIP_SYM[sym]
+        for sq in squares:
+            key ^= flip_keys[sq]
+        new_keys.append(key)
+    return new_keys
+
+
+class TranspositionTable:
+    """
+    Fixed-size transposition table stored in flat arrays.
+
+    Each slot keeps the full key, the search depth, the bound type
+    (EXACT, LOWER or UPPER), the value and the best move as a square index.
+    Values are stored from the perspective of the side to move.
+    """
+
+    def __init__(self, size_mb=16, replacement='depth'):
+        """
+        Parameters:
+            size_mb (float): Memory budget of the table in megabytes.
+            replacement (str): 'depth' keeps deeper entries from the current search,
+                'always' overwrites the slot on every store.
+        """
+        if replacement not in REPLACEMENT_POLICIES:
+            raise ValueError(f"Unknown replacement policy: {replacement}")
+        slots = max(1, int(size_mb * 1024 * 1024) // ENTRY_BYTES)
+        size = 1 << (slots.bit_length() - 1)  # round down to a power of two
+        self.mask = size - 1
+        self.replacement = replacement
+        self.age = 0
+        self.keys = array('Q', bytes(8 * size))
+        self.values = array('d', bytes(8 * size))
+        self.depths = array('b', bytes(size))
+        self.bounds = array('B', bytes(size))
+        self.moves = array('b', bytes(size))
+        self.ages = array('B', bytes(size))
+
+    def __len__(self):
+        return self.mask + 1
+
+    def new_search(self):
+        """Mark every stored entry as belonging to an earlier search."""
+        self.age = (self.age + 1) & 0xFF
+
+    def clear(self):
+        size = len(self)
+        self.keys = array('Q', bytes(8 * size))
+        self.ages = array('B', bytes(size))
+
+    def probe(self, key, sym=0):
+        """
+        Look up a position.
+
+        Parameters:
+            key (int): The position key.
+            sym (int): For canonical keys, the symmetry that maps the board to the
+                stored orientation; the move is mapped back through it.
+
+        Returns:
+            tuple: (depth, bound, value, move) or None if the position is not stored.
+                The move is a (row, col) tuple or None.
+        """
+        i = key & self.mask
+        if self.keys[i] != key:
+            return None
+        square = self.moves[i]
+        if square < 0:
+            return self.depths[i], self.bounds[i], self.values[i], None
+        if sym:
+            square = SQUARE_MAP[INVERSE[sym]][square]
+        return self.depths[i], self.bounds[i], self.values[i], divmod(square, 8)
+
+    def store(self, key, depth, bound, value, move, sym=0):
+        i = key & self.mask
+        if (self.replacement == 'depth' and self.keys[i] != key
+                and self.ages[i] == self.age and self.depths[i] > depth):
+            return
+        self.keys[i] = key
+        self.depths[i] = depth
+        self.bounds[i] = bound
+        self.values[i] = value
+        if move is None:
+            self.moves[i] = -1
+        else:
+            self.moves[i] = SQUARE_MAP[sym][move[0] * 8 + move[1]] if sym else move[0] * 8 + move[1]
+        self.ages[i] = self.age
+
+
+class SharedTranspositionTable:
+    """
+    Transposition table in a multiprocessing.shared_memory block for multi-process search.
+
+    Each 16-byte slot holds key ^ data followed by data, where data packs the value
+    (float32), depth, bound, move and age into one 64-bit word. Writers never lock:
+    a reader only accepts a slot whose two words XOR back to the probed key, so an
+    entry torn by a concurrent write is treated as a miss. Pickling the table
+    (e.g. as a worker argument) attaches the receiving process to the same block.
+    """
+
+    SLOT_BYTES = 16
+
+    def __init__(self, size_mb=16, replacement='depth'):
+        """
+        Parameters:
+            size_mb (float): Memory budget of the table in megabytes.
+            replacement (str): 'depth' keeps deeper entries from the current search,
+                'always' overwrites the slot on every store.
+        """
+        if replacement not in REPLACEMENT_POLICIES:
+            raise ValueError(f"Unknown replacement policy: {replacement}")
+        slots = max(1, int(size_mb * 1024 * 1024) // self.SLOT_BYTES)
+        size = 1 << (slots.bit_length() - 1)  # round down to a power of two
+        self._shm = shared_memory.SharedMemory(create=True, size=size * self.SLOT_BYTES)
+        self._owner = True
+        self._attach(size, replacement, 0)
+
+    def _attach(self, size, replacement, age):
+        self.mask = size - 1
+        self.replacement = replacement
+        self.age = age
+        self.slots = self._shm.buf.cast('Q')
+
+    def __getstate__(self):
+        return self._shm.name, self.mask + 1, self.replacement, self.age
+
+    def __setstate__(self, state):
+        name, size, replacement, age = state
+        # Only the creating process may unlink the block; before 3.13 attaching can
+        # not opt out of tracking, which is harmless with the default fork start method
+        if sys.version_info >= (3, 13):
+            self._shm = shared_memory.SharedMemory(name=name, track=False)
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+        self._owner = False
+        self._attach(size, replacement, age)
+
+    def __len__(self):
+        return self.mask + 1
+
+    def close(self):
+        """Detach from the shared block, and free it in the process that created it."""
+        self.slots.release()
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+    def new_search(self):
+        """Mark every stored entry as belonging to an earlier search."""
+        self.age = (self.age + 1) & 0xFF
+
+    def clear(self):
+        self.slots[:] = array('Q', bytes(len(self.slots) * 8))
+
+    def probe(self, key, sym=0):
+        """
+        Look up a position.
+
+        Parameters:
+            key (int): The position key.
+            sym (int): For canonical keys, the symmetry that maps the board to the
+                stored orientation; the move is mapped back through it.
+
+        Returns:
+            tuple: (depth, bound, value, move) or None if the position is not stored.
+                The move is a (row, col) tuple or None.
+        """
+        i = (key & self.mask) << 1
+        data = self.slots[i + 1]
+        if self.slots[i] ^ data != key:
+            return None
+        value = _FLOAT.unpack(_UINT.pack(data >> 32))[0]
+        square = ((data >> 8) & 0x7F) - 1
+        bound = (data >> 15) & 0x3
+        depth = (data >> 17) & 0xFF
+        if square < 0:
+            return depth, bound, value, None
+        if sym:
+            square = SQUARE_MAP[INVERSE[sym]][square]
+        return depth, bound, value, divmod(square, 8)
+
+    def store(self, key, depth, bound, value, move, sym=0):
+        i = (key & self.mask) << 1
+        if self.replacement == 'depth':
+            old = self.slots[i + 1]
+            if (self.slots[i] ^ old != key and old & 0xFF == self.age
+                    and (old >> 17) & 0xFF > depth):
+                return
+        if move is None:
+            square = -1
+        else:
+            square = SQUARE_MAP[sym][move[0] * 8 + move[1]] if sym else move[0] * 8 + move[1]
+        data = (_UINT.unpack(_FLOAT.pack(value))[0] << 32) | (depth << 17) | (bound << 15) | \
+            ((square + 1) << 8) | self.age
+        self.slots[i + 1] = data
+        self.slots[i] = key ^ data